@@ -5,8 +5,10 @@ to provide async access from the MCP server.
 """
 
 import asyncio
+import itertools
 import logging
 import threading
+import time
 from concurrent.futures import ThreadPoolExecutor
 from typing import Any, Callable, Optional
 
@@ -94,16 +96,13 @@ from .references import (  # noqa: E402
     ElementRole,
     ElementState,
     ReferenceManager,
+    role_from_str,
 )
 
 
 def _get_role_from_atspi(atspi_role: int) -> ElementRole:
     """Map AT-SPI role to ElementRole enum."""
-    role_str = ROLE_MAPPING.get(atspi_role, "unknown")
-    try:
-        return ElementRole(role_str)
-    except ValueError:
-        return ElementRole.UNKNOWN
+    return role_from_str(ROLE_MAPPING.get(atspi_role, "unknown"))
 
 
 def _get_state_from_atspi(state_set: Any) -> ElementState:
@@ -181,8 +180,20 @@ class ATSPIBridge:
     """Async bridge to AT-SPI2 accessibility tree.
 
     Provides thread-safe async access to pyatspi operations.
+
+    All D-Bus traffic goes through libatspi; the bridge never opens bus
+    connections of its own. Per-application routing (including peer-to-peer
+    connections obtained via ``GetApplicationBusAddress``) is therefore left
+    to libatspi rather than duplicated here with a second D-Bus client.
     """
 
+    # A build_tree* call repeating the previous one within this many seconds
+    # reuses its result instead of walking the tree again. Only the bridge's
+    # own input actions invalidate it, so other UI changes (a dialog opening,
+    # a label updating) can be up to this stale; callers needing a live view
+    # call invalidate_tree_cache() first.
+    TREE_CACHE_TTL = 2.0
+
     def __init__(self, max_workers: int = 4) -> None:
         if not ATSPI_AVAILABLE:
             raise ATSPINotAvailableError(
@@ -192,6 +203,9 @@ class ATSPIBridge:
         self._executor = ThreadPoolExecutor(max_workers=max_workers)
         self._lock = threading.Lock()
         self._ref_manager = ReferenceManager()
+        self._tree_cache: Optional[tuple[tuple, float, list[ElementReference]]] = None
+        # Refs of a cached full-desktop build bucketed by app name, built on demand
+        self._app_index: Optional[dict[str, list[ElementReference]]] = None
 
     @property
     def ref_manager(self) -> ReferenceManager:
@@ -208,6 +222,56 @@ class ATSPIBridge:
 
         return await loop.run_in_executor(self._executor, _wrapped)
 
+    def invalidate_tree_cache(self) -> None:
+        """Make the next build_tree* call rescan the accessibility tree."""
+        self._tree_cache = None
+        self._app_index = None
+
+    def _fresh_tree(self, key: tuple) -> Optional[list[ElementReference]]:
+        """Get the last build's refs if it had the same key and is still fresh."""
+        cached = self._tree_cache
+        if cached and cached[0] == key and time.monotonic() - cached[1] < self.TREE_CACHE_TTL:
+            return cached[2]
+        return None
+
+    def _cached_tree(self, key: tuple) -> Optional[list[ElementReference]]:
+        """Get a copy of the last build's refs if it had the same key and is still fresh."""
+        refs = self._fresh_tree(key)
+        return list(refs) if refs is not None else None
+
+    def _store_tree(self, key: tuple, refs: list[ElementReference]) -> list[ElementReference]:
+        """Remember the refs of a completed build under its key."""
+        self._tree_cache = (key, time.monotonic(), refs)
+        self._app_index = None
+        return list(refs)
+
+    def refs_for_app(self, app_name: str, max_depth: int = 15) -> Optional[list[ElementReference]]:
+        """Get refs for matching applications from a fresh full-desktop build.
+
+        Matches app names the same way as ``build_tree(app_name_filter=...)``.
+
+        Args:
+            app_name: Case-insensitive substring of the application name.
+            max_depth: Depth the full-desktop build must have been made with.
+
+        Returns:
+            Refs of the matching applications, or None if no fresh unfiltered
+            ``build_tree`` result with this depth is cached.
+        """
+        refs = self._fresh_tree(("desktop", None, max_depth))
+        if refs is None:
+            return None
+
+        index = self._app_index
+        if index is None:
+            index = {}
+            for ref in refs:
+                index.setdefault(ref.app_name or "", []).append(ref)
+            self._app_index = index
+
+        needle = app_name.lower()
+        return [ref for name, bucket in index.items() if needle in name.lower() for ref in bucket]
+
     def _get_desktop_sync(self) -> Any:
         """Get the desktop accessible (sync)."""
         return Atspi.get_desktop(0)
@@ -242,9 +306,15 @@ class ATSPIBridge:
         app_name: Optional[str] = None,
         window_title: Optional[str] = None,
         parent_ref: Optional[str] = None,
+        refs: Optional[list[ElementReference]] = None,
     ) -> list[ElementReference]:
-        """Build element tree from accessible (sync)."""
-        refs: list[ElementReference] = []
+        """Build element tree from accessible (sync).
+
+        Refs are appended in pre-order to ``refs`` (a new list if omitted),
+        which is shared down the recursion and returned.
+        """
+        if refs is None:
+            refs = []
 
         if current_depth > max_depth:
             return refs
@@ -289,18 +359,19 @@ class ATSPIBridge:
                 try:
                     child = accessible.get_child_at_index(i)
                     if child:
-                        child_refs = self._build_tree_sync(
+                        start = len(refs)
+                        self._build_tree_sync(
                             child,
                             max_depth=max_depth,
                             current_depth=current_depth + 1,
                             app_name=app_name,
                             window_title=window_title,
                             parent_ref=ref_id,
+                            refs=refs,
                         )
-                        for child_ref in child_refs:
-                            if child_ref.parent_ref == ref_id:
-                                ref.child_refs.append(child_ref.ref_id)
-                        refs.extend(child_refs)
+                        # Pre-order: the child's own ref is the first one it added
+                        if len(refs) > start:
+                            ref.child_refs.append(refs[start].ref_id)
                 except _GLibError as e:
                     logger.debug(f"Error traversing child {i}: {e}")
 
@@ -309,11 +380,27 @@ class ATSPIBridge:
 
         return refs
 
+    def _build_app_tree_sync(
+        self, app: Any, app_name_filter: Optional[str], max_depth: int
+    ) -> list[ElementReference]:
+        """Build element tree for one application if it passes the filter (sync)."""
+        try:
+            app_name = app.get_name() or ""
+            if app_name_filter and app_name_filter.lower() not in app_name.lower():
+                return []
+            return self._build_tree_sync(app, max_depth=max_depth)
+        except _GLibError as e:
+            logger.debug(f"Error processing app: {e}")
+            return []
+
     async def build_tree(
         self, app_name_filter: Optional[str] = None, max_depth: int = 15
     ) -> list[ElementReference]:
         """Build the full accessibility tree.
 
+        The reference manager is cleared and refilled in a single executor job,
+        so no other bridge call can run between the two.
+
         Args:
             app_name_filter: Only include elements from this application.
             max_depth: Maximum tree traversal depth.
@@ -321,26 +408,45 @@ class ATSPIBridge:
         Returns:
             List of ElementReferences for all discovered elements.
         """
-        self._ref_manager.clear()
+        key = ("desktop", app_name_filter, max_depth)
+        cached = self._cached_tree(key)
+        if cached is not None:
+            return cached
 
         def _build() -> list[ElementReference]:
+            self._ref_manager.clear()
             all_refs: list[ElementReference] = []
-            apps = self._get_applications_sync()
+            for app in self._get_applications_sync():
+                all_refs.extend(self._build_app_tree_sync(app, app_name_filter, max_depth))
+            return all_refs
 
-            for app in apps:
-                try:
-                    app_name = app.get_name() or ""
-                    if app_name_filter and app_name_filter.lower() not in app_name.lower():
-                        continue
+        return self._store_tree(key, await self._run_sync(_build))
 
-                    refs = self._build_tree_sync(app, max_depth=max_depth)
-                    all_refs.extend(refs)
-                except _GLibError as e:
-                    logger.debug(f"Error processing app: {e}")
+    def _build_window_tree_sync(
+        self, window_accessible: Any, max_depth: int = 15
+    ) -> list[ElementReference]:
+        """Build element tree for a single window (sync)."""
+        try:
+            # Get app name from parent application
+            app_name = ""
+            try:
+                app = window_accessible.get_application()
+                if app:
+                    app_name = app.get_name() or ""
+            except _GLibError:
+                pass
 
-            return all_refs
+            window_title = window_accessible.get_name() or ""
 
-        return await self._run_sync(_build)
+            return self._build_tree_sync(
+                window_accessible,
+                max_depth=max_depth,
+                app_name=app_name,
+                window_title=window_title,
+            )
+        except _GLibError as e:
+            logger.error(f"Error building tree for window: {e}")
+            return []
 
     async def build_tree_for_window(
         self, window_accessible: Any, max_depth: int = 15
@@ -357,38 +463,23 @@ class ATSPIBridge:
         Returns:
             List of ElementReferences for elements within this window.
         """
-        self._ref_manager.clear()
-
-        def _build() -> list[ElementReference]:
-            try:
-                # Get app name from parent application
-                app_name = ""
-                try:
-                    app = window_accessible.get_application()
-                    if app:
-                        app_name = app.get_name() or ""
-                except _GLibError:
-                    pass
-
-                window_title = window_accessible.get_name() or ""
-
-                return self._build_tree_sync(
-                    window_accessible,
-                    max_depth=max_depth,
-                    app_name=app_name,
-                    window_title=window_title,
-                )
-            except _GLibError as e:
-                logger.error(f"Error building tree for window: {e}")
-                return []
+        key = ("windows", (window_accessible,), max_depth)
+        cached = self._cached_tree(key)
+        if cached is not None:
+            return cached
 
-        return await self._run_sync(_build)
+        self._ref_manager.clear()
+        refs = await self._run_sync(self._build_window_tree_sync, window_accessible, max_depth)
+        return self._store_tree(key, refs)
 
     async def build_tree_for_windows(
         self, window_accessibles: list[Any], max_depth: int = 15
     ) -> list[ElementReference]:
         """Build accessibility tree for multiple windows.
 
+        Each window is submitted as its own executor job, so the bridge lock is
+        released between windows instead of being held for the whole group.
+
         Args:
             window_accessibles: List of AT-SPI accessible objects for windows.
             max_depth: Maximum tree traversal depth.
@@ -396,35 +487,19 @@ class ATSPIBridge:
         Returns:
             List of ElementReferences for elements within all specified windows.
         """
-        self._ref_manager.clear()
+        key = ("windows", tuple(window_accessibles), max_depth)
+        cached = self._cached_tree(key)
+        if cached is not None:
+            return cached
 
-        def _build() -> list[ElementReference]:
-            all_refs: list[ElementReference] = []
-            for window_accessible in window_accessibles:
-                try:
-                    # Get app name from parent application
-                    app_name = ""
-                    try:
-                        app = window_accessible.get_application()
-                        if app:
-                            app_name = app.get_name() or ""
-                    except _GLibError:
-                        pass
-
-                    window_title = window_accessible.get_name() or ""
-
-                    refs = self._build_tree_sync(
-                        window_accessible,
-                        max_depth=max_depth,
-                        app_name=app_name,
-                        window_title=window_title,
-                    )
-                    all_refs.extend(refs)
-                except _GLibError as e:
-                    logger.debug(f"Error processing window: {e}")
-            return all_refs
-
-        return await self._run_sync(_build)
+        self._ref_manager.clear()
+        results = await asyncio.gather(
+            *(
+                self._run_sync(self._build_window_tree_sync, window_accessible, max_depth)
+                for window_accessible in window_accessibles
+            )
+        )
+        return self._store_tree(key, list(itertools.chain.from_iterable(results)))
 
     def _click_element_sync(self, accessible: Any, button: str = "left") -> bool:
         """Click an element using AT-SPI action interface (sync)."""
@@ -459,6 +534,7 @@ class ATSPIBridge:
         if ref.atspi_accessible is None:
             return False
 
+        self.invalidate_tree_cache()
         return await self._run_sync(self._click_element_sync, ref.atspi_accessible, button)
 
     def _focus_element_sync(self, accessible: Any) -> bool:
@@ -476,6 +552,7 @@ class ATSPIBridge:
         if ref.atspi_accessible is None:
             return False
 
+        self.invalidate_tree_cache()
         return await self._run_sync(self._focus_element_sync, ref.atspi_accessible)
 
     def _set_text_sync(self, accessible: Any, text: str, clear_first: bool = True) -> bool:
@@ -509,6 +586,7 @@ class ATSPIBridge:
         if ref.atspi_accessible is None:
             return False
 
+        self.invalidate_tree_cache()
         return await self._run_sync(self._set_text_sync, ref.atspi_accessible, text, clear_first)
 
     def _get_element_at_point_sync(self, x: int, y: int) -> Optional[Any]:
@@ -550,4 +628,5 @@ class ATSPIBridge:
     async def shutdown(self) -> None:
         """Shutdown the bridge and cleanup resources."""
         self._executor.shutdown(wait=True)
+        self.invalidate_tree_cache()
         self._ref_manager.clear()
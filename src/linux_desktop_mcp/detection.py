@@ -1,5 +1,6 @@
 """Platform and capability detection for Linux desktop automation."""
 
+import functools
 import os
 import shutil
 import subprocess
@@ -54,6 +55,7 @@ class PlatformCapabilities:
         return self.has_scrot or self.has_grim
 
 
+@functools.lru_cache(maxsize=1)
 def detect_display_server() -> DisplayServer:
     """Detect the current display server (X11, Wayland, or XWayland).
 
@@ -74,6 +76,7 @@ def detect_display_server() -> DisplayServer:
     return DisplayServer.UNKNOWN
 
 
+@functools.lru_cache(maxsize=None)
 def _check_command_exists(command: str) -> bool:
     """Check if a command exists in PATH."""
     return shutil.which(command) is not None
@@ -117,6 +120,7 @@ def _check_ydotool_daemon() -> bool:
         return False
 
 
+@functools.lru_cache(maxsize=1)
 def _detect_compositor() -> Optional[str]:
     """Detect the Wayland compositor in use.
 
@@ -149,6 +153,17 @@ def _detect_compositor() -> Optional[str]:
     return None
 
 
+def clear_detection_cache() -> None:
+    """Forget memoized environment and PATH lookups.
+
+    Display server, compositor and command lookups are cached for the life of
+    the process; call this after changing the environment or PATH.
+    """
+    detect_display_server.cache_clear()
+    _detect_compositor.cache_clear()
+    _check_command_exists.cache_clear()
+
+
 def _check_layer_shell_available() -> bool:
     """Check if gtk4-layer-shell is available and compositor supports it.
 
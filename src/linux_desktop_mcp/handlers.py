@@ -6,17 +6,21 @@ that carries shared state and a ``HANDLER_MAP`` dispatcher.
 """
 
 import asyncio
+import functools
+import io
 import logging
+from collections import deque
 from dataclasses import dataclass
-from typing import Any, Optional
+from typing import Any, Callable, Optional
 
 from mcp.types import TextContent
 
 from .atspi_bridge import ATSPIBridge
 from .detection import PlatformCapabilities
+from .exceptions import InputValidationError
 from .input_backends import InputManager
 from .overlay import OverlayManager
-from .references import ElementReference
+from .references import ElementReference, ElementRole
 from .window_discovery import WindowDiscovery
 from .window_manager import GroupColor, WindowGeometry, WindowGroupManager
 
@@ -28,8 +32,46 @@ MAX_QUERY_LENGTH = 1000
 MAX_COORDINATE = 65535
 MIN_COORDINATE = 0
 
-
-@dataclass
+# MAX_COORDINATE is 2**16 - 1, so an int is in range iff nothing survives this shift
+# (negative ints shift to -1)
+_COORDINATE_BITS = MAX_COORDINATE.bit_length()
+
+# Snapshot output is split into TextContent blocks of this many element lines
+SNAPSHOT_CHUNK_LINES = 1000
+
+# Canned responses, built once instead of on every call
+_ERR_ATSPI_INSTALL = TextContent(
+    type="text",
+    text="Error: AT-SPI2 not available. Install: sudo apt install python3-pyatspi gir1.2-atspi-2.0 at-spi2-core",
+)
+_ERR_NO_ATSPI = TextContent(type="text", text="Error: AT-SPI2 not available")
+_MSG_TARGETS_CLOSED = TextContent(
+    type="text",
+    text="All targeted windows have been closed. Use desktop_target_window to target new windows.",
+)
+_MSG_NO_ELEMENTS = TextContent(
+    type="text",
+    text="No elements found. Ensure applications are running and accessibility is enabled.",
+)
+_ERR_EMPTY_QUERY = TextContent(type="text", text="Error: Query cannot be empty")
+_ERR_NO_INPUT = TextContent(type="text", text="Error: No input backend available")
+_ERR_COORD_FORMAT = TextContent(type="text", text="Error: Coordinate must be [x, y]")
+_ERR_CLICK_TARGET = TextContent(type="text", text="Error: Provide either ref or coordinate")
+_ERR_NO_KEYBOARD = TextContent(type="text", text="Error: No keyboard input available")
+_MSG_TYPE_FAILED = TextContent(type="text", text="Failed to type text")
+_ERR_KEY_REQUIRED = TextContent(type="text", text="Error: Key name is required")
+_ERR_KEY_TOO_LONG = TextContent(type="text", text="Error: Key name too long")
+_MSG_KEY_FAILED = TextContent(type="text", text="Failed to press key")
+_ERR_NO_WINDOW_DISCOVERY = TextContent(type="text", text="Error: Window discovery not available")
+_ERR_TARGET_ARGS = TextContent(
+    type="text", text="Error: Provide either window_title, app_name, or window_id"
+)
+_ERR_RELEASE_ARGS = TextContent(
+    type="text", text="Error: Provide window_id or set release_all=true"
+)
+
+
+@dataclass(slots=True)
 class ServerContext:
     """Shared state passed to every handler function."""
 
@@ -44,26 +86,164 @@ class ServerContext:
 
     def validate_coordinate(self, value: int) -> bool:
         """Validate a coordinate value is within bounds."""
+        if value.__class__ is int:
+            return value >> _COORDINATE_BITS == 0
         return MIN_COORDINATE <= value <= MAX_COORDINATE
 
-    def validate_coordinates(self, x: int, y: int) -> tuple[bool, str]:
-        """Validate x,y coordinates. Returns (is_valid, error_message)."""
-        if not isinstance(x, (int, float)) or not isinstance(y, (int, float)):
-            return False, "Coordinates must be numbers"
-        x, y = int(x), int(y)
-        if not self.validate_coordinate(x):
-            return False, f"X coordinate {x} out of range (0-{MAX_COORDINATE})"
-        if not self.validate_coordinate(y):
-            return False, f"Y coordinate {y} out of range (0-{MAX_COORDINATE})"
-        return True, ""
-
-    def validate_string(self, value: str, max_len: int, name: str = "value") -> tuple[bool, str]:
-        """Validate a string value. Returns (is_valid, error_message)."""
+    def validate_coordinates(self, x: int, y: int) -> tuple[int, int]:
+        """Validate x,y coordinates and return them as ints.
+
+        Raises:
+            InputValidationError: If either value is not a number or is out of range.
+        """
+        try:
+            # Fast path: integer payloads need no isinstance checks or casts
+            x, y = x.__index__(), y.__index__()
+        except (AttributeError, TypeError):
+            if not isinstance(x, (int, float)) or not isinstance(y, (int, float)):
+                raise InputValidationError("Coordinates must be numbers") from None
+            x, y = int(x), int(y)
+        if (x >> _COORDINATE_BITS) | (y >> _COORDINATE_BITS) == 0:
+            return x, y
+        if not MIN_COORDINATE <= x <= MAX_COORDINATE:
+            raise InputValidationError(f"X coordinate {x} out of range (0-{MAX_COORDINATE})")
+        raise InputValidationError(f"Y coordinate {y} out of range (0-{MAX_COORDINATE})")
+
+    def validate_string(self, value: str, max_len: int, name: str = "value") -> None:
+        """Validate a string value.
+
+        Raises:
+            InputValidationError: If the value is not a string or is too long.
+        """
         if not isinstance(value, str):
-            return False, f"{name} must be a string"
+            raise InputValidationError(f"{name} must be a string")
         if len(value) > max_len:
-            return False, f"{name} too long ({len(value)} > {max_len})"
-        return True, ""
+            raise InputValidationError(f"{name} too long ({len(value)} > {max_len})")
+
+
+def mcp_handler(fn):
+    """Turn ``InputValidationError`` raised by a handler into an error response."""
+
+    @functools.wraps(fn)
+    async def wrapper(ctx: ServerContext, args: dict[str, Any]) -> list[TextContent]:
+        try:
+            return await fn(ctx, args)
+        except InputValidationError as e:
+            return [TextContent(type="text", text=f"Error: {e}")]
+
+    return wrapper
+
+
+# ---------------------------------------------------------------------------
+# Capabilities report
+# ---------------------------------------------------------------------------
+
+
+# Rendered templates keyed by id() of the capabilities they were built from;
+# PlatformCapabilities is a mutable dataclass and so unhashable. The object is
+# kept in the value so a reused id is never mistaken for a hit. A process
+# normally holds a single capabilities object.
+_caps_templates: dict[int, tuple[PlatformCapabilities, str]] = {}
+
+
+def capabilities_template(caps: PlatformCapabilities) -> str:
+    """Get the ``str.format`` template for the desktop_capabilities report."""
+    cached = _caps_templates.get(id(caps))
+    if cached is None or cached[0] is not caps:
+        cached = _caps_templates[id(caps)] = (caps, _render_capabilities_template(caps))
+    return cached[1]
+
+
+def _render_capabilities_template(caps: PlatformCapabilities) -> str:
+    """Render the parts of the capabilities report that never change after startup.
+
+    Leaves ``{input_backend}``, ``{can_click}``, ``{can_type}``,
+    ``{window_discovery}`` and ``{overlay}`` placeholders for the per-call fields.
+    """
+
+    def avail(flag: bool) -> str:
+        return "Available" if flag else "Not found"
+
+    def static(text: str) -> str:
+        return text.replace("{", "{{").replace("}", "}}")
+
+    compositor = f"Compositor: {caps.compositor_name}\n" if caps.compositor_name else ""
+    return (
+        static(
+            "# Linux Desktop Automation Capabilities\n"
+            "\n"
+            f"Display Server: {caps.display_server.value}\n"
+            f"{compositor}"
+            f"AT-SPI2 Available: {caps.has_atspi}\n"
+            f"AT-SPI2 Registry Running: {caps.atspi_registry_available}\n"
+        )
+        + "\n"
+        "## Input Tools\n"
+        f"- ydotool: {avail(caps.has_ydotool)}\n"
+        f"- xdotool: {avail(caps.has_xdotool)}\n"
+        f"- wtype: {avail(caps.has_wtype)}\n"
+        "\n"
+        "Active Input Backend: {input_backend}\n"
+        "Can Click: {can_click}\n"
+        "Can Type: {can_type}\n"
+        "\n"
+        "## Screenshot Tools\n"
+        f"- scrot: {avail(caps.has_scrot)}\n"
+        f"- grim: {avail(caps.has_grim)}\n"
+        "\n"
+        "## OCR Tools\n"
+        f"- tesseract: {avail(caps.has_tesseract)}\n"
+        "\n"
+        "## Window Targeting\n"
+        "- Window Discovery: {window_discovery}\n"
+        "{overlay}" + ("- Layer Shell: Available\n" if caps.has_layer_shell else "")
+    )
+
+
+# ---------------------------------------------------------------------------
+# Argument unpacking
+# ---------------------------------------------------------------------------
+
+
+def _args_getter(**defaults: Any) -> Callable[[dict[str, Any]], tuple]:
+    """Build a function that pulls ``defaults``' keys out of tool args in one call."""
+    keys = tuple(defaults)
+    values = tuple(defaults.values())
+
+    def get(args: dict[str, Any]) -> tuple:
+        return tuple(map(args.get, keys, values))
+
+    return get
+
+
+_CLICK_ARGS = _args_getter(
+    ref=None, coordinate=None, button="left", click_type="single", modifiers=None, element="element"
+)
+_TYPE_ARGS = _args_getter(text="", ref=None, clear_first=False, submit=False, element="element")
+_TARGET_WINDOW_ARGS = _args_getter(window_title=None, app_name=None, window_id=None, color="blue")
+
+
+# ---------------------------------------------------------------------------
+# Snapshot pruning
+# ---------------------------------------------------------------------------
+
+# Roles whose label children carry meaningful inline text of their own
+_TEXT_CONTAINER_ROLES = frozenset(
+    {ElementRole.PARAGRAPH, ElementRole.HEADING, ElementRole.DOCUMENT, ElementRole.DOCUMENT_WEB}
+)
+
+# Private-use glyphs (U+E600-U+E6FF) are icon-font characters, not text
+_STRIP_ICON_GLYPHS = dict.fromkeys(range(0xE600, 0xE700))
+
+
+def _is_redundant_label(ref: ElementReference, parent: Optional[ElementReference]) -> bool:
+    """Check if a label only repeats text already present in its parent's name."""
+    if parent is None or ref.role is not ElementRole.LABEL:
+        return False
+    if parent.role in _TEXT_CONTAINER_ROLES:
+        return False
+    text = ref.name.translate(_STRIP_ICON_GLYPHS).strip()
+    return bool(text) and text in parent.name.translate(_STRIP_ICON_GLYPHS)
 
 
 # ---------------------------------------------------------------------------
@@ -71,36 +251,30 @@ class ServerContext:
 # ---------------------------------------------------------------------------
 
 
+@mcp_handler
 async def handle_snapshot(ctx: ServerContext, args: dict[str, Any]) -> list[TextContent]:
     """Handle desktop_snapshot tool."""
     if ctx.bridge is None:
-        return [
-            TextContent(
-                type="text",
-                text="Error: AT-SPI2 not available. Install: sudo apt install python3-pyatspi gir1.2-atspi-2.0 at-spi2-core",
-            )
-        ]
+        return [_ERR_ATSPI_INSTALL]
 
     app_name = args.get("app_name")
     max_depth = args.get("max_depth", 15)
+    if args.get("refresh", False):
+        ctx.bridge.invalidate_tree_cache()
 
     # Check if we have targeted windows - if so, only scan those
     group = ctx.window_manager.get_active_group() if ctx.window_manager else None
+    windows = group.windows if group else None
     targeted_mode = False
 
-    if group and group.windows and not app_name:
+    if windows and not app_name:
         # Use targeted windows for reduced context
         targeted_mode = True
         # Validate windows first (remove closed ones)
         group.validate_windows()
 
-        if not group.windows:
-            return [
-                TextContent(
-                    type="text",
-                    text="All targeted windows have been closed. Use desktop_target_window to target new windows.",
-                )
-            ]
+        if not windows:
+            return [_MSG_TARGETS_CLOSED]
 
         # Get active window or all windows in group
         active_window = group.get_active_window()
@@ -112,81 +286,104 @@ async def handle_snapshot(ctx: ServerContext, args: dict[str, Any]) -> list[Text
         else:
             # Build tree for all windows in group
             window_accessibles = [
-                t.atspi_accessible for t in group.windows.values() if t.atspi_accessible
+                t.atspi_accessible for t in windows.values() if t.atspi_accessible
             ]
             refs = await ctx.bridge.build_tree_for_windows(window_accessibles, max_depth=max_depth)
-            window_info = f"All {len(group.windows)} targeted windows"
+            window_info = f"All {len(windows)} targeted windows"
     else:
-        # No targeting - use full desktop scan (original behavior)
-        refs = await ctx.bridge.build_tree(app_name_filter=app_name, max_depth=max_depth)
+        # No targeting - use full desktop scan (original behavior). An app filter
+        # can be served from a full-desktop scan up to TREE_CACHE_TTL old without
+        # walking the tree; refresh has already dropped that scan above.
+        refs = ctx.bridge.refs_for_app(app_name, max_depth) if app_name else None
+        if refs is None:
+            refs = await ctx.bridge.build_tree(app_name_filter=app_name, max_depth=max_depth)
         window_info = None
 
     if not refs:
-        return [
-            TextContent(
-                type="text",
-                text="No elements found. Ensure applications are running and accessibility is enabled.",
-            )
-        ]
+        return [_MSG_NO_ELEMENTS]
 
+    results: list[TextContent] = []
+    buf = io.StringIO()
+    w = buf.write
     if targeted_mode:
-        output_lines = ["# Accessibility Tree (Targeted)", f"# {window_info}", ""]
+        w(f"# Accessibility Tree (Targeted)\n# {window_info}\n\n")
     else:
-        output_lines = ["# Desktop Accessibility Tree", ""]
+        w("# Desktop Accessibility Tree\n")
         if app_name:
-            output_lines.insert(1, f"# Filtered by app: {app_name}")
-
-    def build_tree_output(ref: ElementReference, indent: int = 0) -> list[str]:
-        lines = [ref.format_for_display(indent)]
-        for child_id in ref.child_refs:
-            child = ctx.bridge.ref_manager.get(child_id)
-            if child:
-                lines.extend(build_tree_output(child, indent + 1))
-        return lines
-
+            w(f"# Filtered by app: {app_name}\n")
+        w("\n")
+
+    # Iterative DFS: deep widget trees would otherwise cost one Python frame
+    # per node and can hit the recursion limit. Children are resolved from the
+    # refs just built rather than through the reference manager's TTL checks.
+    ref_get = {r.ref_id: r for r in refs}.get
+    # Redundant labels are pruned and their children spliced into the parent.
+    shown = 0
     root_refs = [r for r in refs if r.parent_ref is None]
     for root in root_refs:
-        output_lines.extend(build_tree_output(root))
-        output_lines.append("")
+        stack: deque[tuple[ElementReference, int, Optional[ElementReference]]] = deque(
+            [(root, 0, None)]
+        )
+        while stack:
+            ref, indent, parent = stack.pop()
+            if _is_redundant_label(ref, parent):
+                child_indent, child_parent = indent, parent
+            else:
+                w(ref.format_for_display(indent))
+                w("\n")
+                shown += 1
+                child_indent, child_parent = indent + 1, ref
+                if shown % SNAPSHOT_CHUNK_LINES == 0:
+                    # Hand off a finished block and yield to the event loop
+                    results.append(TextContent(type="text", text=buf.getvalue()))
+                    buf = io.StringIO()
+                    w = buf.write
+                    await asyncio.sleep(0)
+            # Push children in reverse so they are popped in display order
+            child_ids = ref.child_refs
+            if child_ids:
+                stack.extend(
+                    (child, child_indent, child_parent)
+                    for child in map(ref_get, reversed(child_ids))
+                    if child is not None
+                )
+        w("\n")
 
-    output_lines.append(f"\nTotal elements: {len(refs)}")
+    w(f"\nTotal elements: {shown}\n")
     if targeted_mode:
-        output_lines.append("(Context reduced via window targeting)")
+        w("(Context reduced via window targeting)\n")
 
-    return [TextContent(type="text", text="\n".join(output_lines))]
+    results.append(TextContent(type="text", text=buf.getvalue()))
+    return results
 
 
+@mcp_handler
 async def handle_find(ctx: ServerContext, args: dict[str, Any]) -> list[TextContent]:
     """Handle desktop_find tool."""
     if ctx.bridge is None:
-        return [TextContent(type="text", text="Error: AT-SPI2 not available")]
+        return [_ERR_NO_ATSPI]
 
     query = args.get("query", "")
     app_name = args.get("app_name")
 
-    # Validate query
-    valid, error = ctx.validate_string(query, MAX_QUERY_LENGTH, "query")
-    if not valid:
-        return [TextContent(type="text", text=f"Error: {error}")]
+    ctx.validate_string(query, MAX_QUERY_LENGTH, "query")
     if not query.strip():
-        return [TextContent(type="text", text="Error: Query cannot be empty")]
+        return [_ERR_EMPTY_QUERY]
+    if args.get("refresh", False):
+        ctx.bridge.invalidate_tree_cache()
 
     # Check if we have targeted windows - if so, only search those
     group = ctx.window_manager.get_active_group() if ctx.window_manager else None
+    windows = group.windows if group else None
     targeted_mode = False
 
-    if group and group.windows and not app_name:
+    if windows and not app_name:
         # Use targeted windows for reduced context
         targeted_mode = True
         group.validate_windows()
 
-        if not group.windows:
-            return [
-                TextContent(
-                    type="text",
-                    text="All targeted windows have been closed. Use desktop_target_window to target new windows.",
-                )
-            ]
+        if not windows:
+            return [_MSG_TARGETS_CLOSED]
 
         # Get active window or all windows in group
         active_window = group.get_active_window()
@@ -194,7 +391,7 @@ async def handle_find(ctx: ServerContext, args: dict[str, Any]) -> list[TextCont
             await ctx.bridge.build_tree_for_window(active_window.atspi_accessible)
         else:
             window_accessibles = [
-                t.atspi_accessible for t in group.windows.values() if t.atspi_accessible
+                t.atspi_accessible for t in windows.values() if t.atspi_accessible
             ]
             await ctx.bridge.build_tree_for_windows(window_accessibles)
     else:
@@ -207,37 +404,40 @@ async def handle_find(ctx: ServerContext, args: dict[str, Any]) -> list[TextCont
         return [TextContent(type="text", text=f"No elements found matching: {query}{scope_note}")]
 
     scope_note = " (in targeted windows)" if targeted_mode else ""
-    output_lines = [f"# Found {len(matches)} elements matching '{query}'{scope_note}", ""]
+    buf = io.StringIO()
+    w = buf.write
+    w(f"# Found {len(matches)} elements matching '{query}'{scope_note}\n\n")
 
     for ref in matches[:20]:
-        state_str = ", ".join(ref.state.to_list()) if ref.state.to_list() else "normal"
-        bounds = f"({ref.bounds.x}, {ref.bounds.y}, {ref.bounds.width}x{ref.bounds.height})"
-        output_lines.append(
-            f'- {ref.ref_id}: [{ref.role.value}] "{ref.name}" ({state_str}) at {bounds}'
+        states = ref.state_list
+        state_str = ", ".join(states) if states else "normal"
+        b = ref.bounds
+        app = ref.app_name
+        actions = ref.available_actions
+        w(
+            f'- {ref.ref_id}: [{ref.role.value}] "{ref.name}" ({state_str}) '
+            f"at ({b.x}, {b.y}, {b.width}x{b.height})\n"
         )
-        if ref.app_name:
-            output_lines.append(f"  App: {ref.app_name}")
-        if ref.available_actions:
-            output_lines.append(f"  Actions: {', '.join(ref.available_actions)}")
-        output_lines.append("")
+        if app:
+            w(f"  App: {app}\n")
+        if actions:
+            w(f"  Actions: {', '.join(actions)}\n")
+        w("\n")
 
     if len(matches) > 20:
-        output_lines.append(f"... and {len(matches) - 20} more")
+        w(f"... and {len(matches) - 20} more\n")
 
-    return [TextContent(type="text", text="\n".join(output_lines))]
+    return [TextContent(type="text", text=buf.getvalue())]
 
 
+@mcp_handler
 async def handle_click(ctx: ServerContext, args: dict[str, Any]) -> list[TextContent]:
     """Handle desktop_click tool."""
     if ctx.bridge is None:
-        return [TextContent(type="text", text="Error: AT-SPI2 not available")]
+        return [_ERR_NO_ATSPI]
 
-    ref_id = args.get("ref")
-    coordinate = args.get("coordinate")
-    button = args.get("button", "left")
-    click_type = args.get("click_type", "single")
-    modifiers = args.get("modifiers")
-    element_desc = args.get("element", "element")
+    ref_id, coordinate, button, click_type, modifiers, element_desc = _CLICK_ARGS(args)
+    ctx.bridge.invalidate_tree_cache()
 
     if ref_id:
         ref = ctx.bridge.ref_manager.get(ref_id)
@@ -272,44 +472,35 @@ async def handle_click(ctx: ServerContext, args: dict[str, Any]) -> list[TextCon
 
     elif coordinate:
         if not ctx.input or not ctx.input.can_click:
-            return [TextContent(type="text", text="Error: No input backend available")]
+            return [_ERR_NO_INPUT]
 
         if len(coordinate) != 2:
-            return [TextContent(type="text", text="Error: Coordinate must be [x, y]")]
-
-        x, y = coordinate
-        valid, error = ctx.validate_coordinates(x, y)
-        if not valid:
-            return [TextContent(type="text", text=f"Error: {error}")]
+            return [_ERR_COORD_FORMAT]
 
-        x, y = int(x), int(y)
+        x, y = ctx.validate_coordinates(*coordinate)
         success = await ctx.input.click(x, y, button, click_type, modifiers)
         if success:
             return [TextContent(type="text", text=f"Clicked at ({x}, {y})")]
         return [TextContent(type="text", text=f"Failed to click at ({x}, {y})")]
 
-    return [TextContent(type="text", text="Error: Provide either ref or coordinate")]
+    return [_ERR_CLICK_TARGET]
 
 
+@mcp_handler
 async def handle_type(ctx: ServerContext, args: dict[str, Any]) -> list[TextContent]:
     """Handle desktop_type tool."""
     if not ctx.input or not ctx.input.can_type:
-        return [TextContent(type="text", text="Error: No keyboard input available")]
+        return [_ERR_NO_KEYBOARD]
 
-    text = args.get("text", "")
-    ref_id = args.get("ref")
+    text, ref_id, clear_first, submit, element_desc = _TYPE_ARGS(args)
 
-    # Validate text length
-    valid, error = ctx.validate_string(text, MAX_TEXT_LENGTH, "text")
-    if not valid:
-        return [TextContent(type="text", text=f"Error: {error}")]
-    clear_first = args.get("clear_first", False)
-    submit = args.get("submit", False)
-    element_desc = args.get("element", "element")
+    ctx.validate_string(text, MAX_TEXT_LENGTH, "text")
+    if ctx.bridge is not None:
+        ctx.bridge.invalidate_tree_cache()
 
     if ref_id:
         if ctx.bridge is None:
-            return [TextContent(type="text", text="Error: AT-SPI2 not available")]
+            return [_ERR_NO_ATSPI]
 
         ref = ctx.bridge.ref_manager.get(ref_id)
         if not ref:
@@ -333,14 +524,11 @@ async def handle_type(ctx: ServerContext, args: dict[str, Any]) -> list[TextCont
             await asyncio.sleep(0.1)
 
     if clear_first:
-        await ctx.input.key("a", ["ctrl"])
-        await asyncio.sleep(0.05)
-        await ctx.input.key("Delete")
-        await asyncio.sleep(0.05)
+        await ctx.input.clear_field()
 
     success = await ctx.input.type_text(text)
     if not success:
-        return [TextContent(type="text", text="Failed to type text")]
+        return [_MSG_TYPE_FAILED]
 
     msg = "Typed text"
     if ref_id:
@@ -354,122 +542,105 @@ async def handle_type(ctx: ServerContext, args: dict[str, Any]) -> list[TextCont
     return [TextContent(type="text", text=msg)]
 
 
+@mcp_handler
 async def handle_key(ctx: ServerContext, args: dict[str, Any]) -> list[TextContent]:
     """Handle desktop_key tool."""
     if not ctx.input or not ctx.input.can_type:
-        return [TextContent(type="text", text="Error: No keyboard input available")]
+        return [_ERR_NO_KEYBOARD]
 
     key = args.get("key", "")
     modifiers = args.get("modifiers")
 
     # Validate key name
     if not key or not isinstance(key, str):
-        return [TextContent(type="text", text="Error: Key name is required")]
+        return [_ERR_KEY_REQUIRED]
     if len(key) > 50:
-        return [TextContent(type="text", text="Error: Key name too long")]
+        return [_ERR_KEY_TOO_LONG]
+
+    if ctx.bridge is not None:
+        ctx.bridge.invalidate_tree_cache()
 
     success = await ctx.input.key(key, modifiers)
     if success:
         mod_str = "+".join(modifiers) + "+" if modifiers else ""
         return [TextContent(type="text", text=f"Pressed {mod_str}{key}")]
 
-    return [TextContent(type="text", text="Failed to press key")]
+    return [_MSG_KEY_FAILED]
 
 
+@mcp_handler
 async def handle_capabilities(ctx: ServerContext, args: dict[str, Any]) -> list[TextContent]:
     """Handle desktop_capabilities tool."""
     caps = ctx.capabilities
-    lines = [
-        "# Linux Desktop Automation Capabilities",
-        "",
-        f"Display Server: {caps.display_server.value}",
-    ]
-    if caps.compositor_name:
-        lines.append(f"Compositor: {caps.compositor_name}")
-    lines.extend(
-        [
-            f"AT-SPI2 Available: {caps.has_atspi}",
-            f"AT-SPI2 Registry Running: {caps.atspi_registry_available}",
-            "",
-            "## Input Tools",
-            f"- ydotool: {'Available' if caps.has_ydotool else 'Not found'}",
-            f"- xdotool: {'Available' if caps.has_xdotool else 'Not found'}",
-            f"- wtype: {'Available' if caps.has_wtype else 'Not found'}",
-            "",
-            f"Active Input Backend: {ctx.input.backend_name if ctx.input else 'None'}",
-            f"Can Click: {ctx.input.can_click if ctx.input else False}",
-            f"Can Type: {ctx.input.can_type if ctx.input else False}",
-            "",
-            "## Screenshot Tools",
-            f"- scrot: {'Available' if caps.has_scrot else 'Not found'}",
-            f"- grim: {'Available' if caps.has_grim else 'Not found'}",
-            "",
-            "## OCR Tools",
-            f"- tesseract: {'Available' if caps.has_tesseract else 'Not found'}",
-            "",
-            "## Window Targeting",
-            f"- Window Discovery: {'Available' if ctx.window_discovery else 'Not available'}",
-        ]
-    )
+    inp = ctx.input
     if ctx.overlay_manager:
-        lines.append(
-            f"- Visual Overlays: {'Available' if ctx.overlay_manager.has_visual_support else 'Not supported'}"
-        )
+        overlay = f"- Visual Overlays: {'Available' if ctx.overlay_manager.has_visual_support else 'Not supported'}\n"
         if caps.display_server.value == "wayland" and caps.compositor_name == "gnome":
-            lines.append("  (GNOME Wayland does not support window overlays)")
+            overlay += "  (GNOME Wayland does not support window overlays)\n"
     else:
-        lines.append("- Visual Overlays: Not initialized")
-    if caps.has_layer_shell:
-        lines.append("- Layer Shell: Available")
+        overlay = "- Visual Overlays: Not initialized\n"
+
+    buf = io.StringIO()
+    w = buf.write
+    w(
+        capabilities_template(caps).format(
+            input_backend=inp.backend_name if inp else "None",
+            can_click=inp.can_click if inp else False,
+            can_type=inp.can_type if inp else False,
+            window_discovery="Available" if ctx.window_discovery else "Not available",
+            overlay=overlay,
+        )
+    )
 
     if caps.errors:
-        lines.append("")
-        lines.append("## Errors/Warnings")
+        w("\n## Errors/Warnings\n")
         for error in caps.errors:
-            lines.append(f"- {error}")
+            w(f"- {error}\n")
 
-    return [TextContent(type="text", text="\n".join(lines))]
+    return [TextContent(type="text", text=buf.getvalue())]
 
 
+@mcp_handler
 async def handle_context(ctx: ServerContext, args: dict[str, Any]) -> list[TextContent]:
     """Handle desktop_context tool - get window group context."""
     list_available = args.get("list_available", False)
-    output_lines = ["# Desktop Context", ""]
+    buf = io.StringIO()
+    w = buf.write
+    w("# Desktop Context\n\n")
 
     # Show current window group info
     group = ctx.window_manager.get_active_group() if ctx.window_manager else None
     if group:
-        output_lines.append("## Active Window Group")
-        output_lines.append(f"- Group ID: {group.group_id}")
+        targets = group.windows
+        w(f"## Active Window Group\n- Group ID: {group.group_id}\n")
         if group.name:
-            output_lines.append(f"- Name: {group.name}")
-        output_lines.append(f"- Color: {group.color.name.lower()} ({group.color.value})")
-        output_lines.append(f"- Windows: {len(group.windows)}")
-        output_lines.append("")
-
-        if group.windows:
-            output_lines.append("### Targeted Windows")
-            # Validate windows first (remove closed ones)
-            removed = group.validate_windows()
+            w(f"- Name: {group.name}\n")
+        w(f"- Color: {group.color.name.lower()} ({group.color.value})\n")
+        w(f"- Windows: {len(targets)}\n\n")
+
+        if targets:
+            w("### Targeted Windows\n")
+            # Validate windows first (remove closed ones); forced so a window
+            # closed since a recent snapshot's check is still reported
+            removed = group.validate_windows(force=True)
             if removed:
-                output_lines.append(f"(Removed {len(removed)} closed windows)")
+                w(f"(Removed {len(removed)} closed windows)\n")
 
-            for target in group.windows.values():
+            for target in targets.values():
                 active_marker = " [ACTIVE]" if target.is_active else ""
                 geom_str = ""
                 if target.geometry:
                     geom_str = f" at ({target.geometry.x}, {target.geometry.y}, {target.geometry.width}x{target.geometry.height})"
-                output_lines.append(
-                    f'- {target.window_id}: "{target.window_title}" ({target.app_name}){geom_str}{active_marker}'
+                w(
+                    f'- {target.window_id}: "{target.window_title}" ({target.app_name}){geom_str}{active_marker}\n'
                 )
-            output_lines.append("")
+            w("\n")
     else:
-        output_lines.append("No active window group. Use desktop_target_window to target a window.")
-        output_lines.append("")
+        w("No active window group. Use desktop_target_window to target a window.\n\n")
 
     # List available windows if requested
     if list_available:
-        output_lines.append("## Available Windows")
+        w("## Available Windows\n")
         if ctx.window_discovery:
             try:
                 windows = await ctx.window_discovery.enumerate_windows()
@@ -479,28 +650,24 @@ async def handle_context(ctx: ServerContext, args: dict[str, Any]) -> list[TextC
                         geom_str = ""
                         if win.geometry:
                             geom_str = f" at ({win.geometry.x}, {win.geometry.y}, {win.geometry.width}x{win.geometry.height})"
-                        output_lines.append(
-                            f'- "{win.window_title}" ({win.app_name}){geom_str}{active_marker}'
-                        )
+                        w(f'- "{win.window_title}" ({win.app_name}){geom_str}{active_marker}\n')
                 else:
-                    output_lines.append("No windows found")
+                    w("No windows found\n")
             except Exception as e:
-                output_lines.append(f"Error enumerating windows: {e}")
+                w(f"Error enumerating windows: {e}\n")
         else:
-            output_lines.append("Window discovery not available")
+            w("Window discovery not available\n")
 
-    return [TextContent(type="text", text="\n".join(output_lines))]
+    return [TextContent(type="text", text=buf.getvalue())]
 
 
+@mcp_handler
 async def handle_target_window(ctx: ServerContext, args: dict[str, Any]) -> list[TextContent]:
     """Handle desktop_target_window tool - target a window for automation."""
     if not ctx.window_discovery:
-        return [TextContent(type="text", text="Error: Window discovery not available")]
+        return [_ERR_NO_WINDOW_DISCOVERY]
 
-    window_title = args.get("window_title")
-    app_name = args.get("app_name")
-    window_id = args.get("window_id")
-    color_str = args.get("color", "blue")
+    window_title, app_name, window_id, color_str = _TARGET_WINDOW_ARGS(args)
     color = GroupColor.from_string(color_str)
 
     # If window_id provided, find in existing targeted windows
@@ -523,11 +690,7 @@ async def handle_target_window(ctx: ServerContext, args: dict[str, Any]) -> list
 
     # Find window by title/app name
     if not window_title and not app_name:
-        return [
-            TextContent(
-                type="text", text="Error: Provide either window_title, app_name, or window_id"
-            )
-        ]
+        return [_ERR_TARGET_ARGS]
 
     try:
         if window_title:
@@ -567,29 +730,30 @@ async def handle_target_window(ctx: ServerContext, args: dict[str, Any]) -> list
             except Exception as e:
                 logger.warning(f"Failed to show border overlay: {e}")
 
-        output_lines = [
-            "# Window Targeted",
-            "",
-            f"- Window ID: {target.window_id}",
-            f'- Title: "{target.window_title}"',
-            f"- Application: {target.app_name}",
-            f"- Group: {group.group_id}",
-            f"- Color: {color.name.lower()}",
-        ]
+        text = (
+            "# Window Targeted\n"
+            "\n"
+            f"- Window ID: {target.window_id}\n"
+            f'- Title: "{target.window_title}"\n'
+            f"- Application: {target.app_name}\n"
+            f"- Group: {group.group_id}\n"
+            f"- Color: {color.name.lower()}"
+        )
         if geometry:
-            output_lines.append(f"- Position: ({geometry.x}, {geometry.y})")
-            output_lines.append(f"- Size: {geometry.width}x{geometry.height}")
-
+            text += (
+                f"\n- Position: ({geometry.x}, {geometry.y})"
+                f"\n- Size: {geometry.width}x{geometry.height}"
+            )
         if len(windows) > 1:
-            output_lines.append("")
-            output_lines.append(f"Note: {len(windows)} windows matched. Targeted first match.")
+            text += f"\n\nNote: {len(windows)} windows matched. Targeted first match."
 
-        return [TextContent(type="text", text="\n".join(output_lines))]
+        return [TextContent(type="text", text=text)]
 
     except Exception as e:
         return [TextContent(type="text", text=f"Error targeting window: {e}")]
 
 
+@mcp_handler
 async def handle_create_window_group(ctx: ServerContext, args: dict[str, Any]) -> list[TextContent]:
     """Handle desktop_create_window_group tool."""
     name = args.get("name")
@@ -599,20 +763,20 @@ async def handle_create_window_group(ctx: ServerContext, args: dict[str, Any]) -
     group = ctx.window_manager.create_group(name=name, color=color)
     ctx.window_manager.set_active_group(group.group_id)
 
-    output_lines = [
-        "# Window Group Created",
-        "",
-        f"- Group ID: {group.group_id}",
-    ]
-    if name:
-        output_lines.append(f"- Name: {name}")
-    output_lines.append(f"- Color: {color.name.lower()} ({color.value})")
-    output_lines.append("")
-    output_lines.append("Use desktop_target_window to add windows to this group.")
-
-    return [TextContent(type="text", text="\n".join(output_lines))]
+    name_line = f"- Name: {name}\n" if name else ""
+    text = (
+        "# Window Group Created\n"
+        "\n"
+        f"- Group ID: {group.group_id}\n"
+        f"{name_line}"
+        f"- Color: {color.name.lower()} ({color.value})\n"
+        "\n"
+        "Use desktop_target_window to add windows to this group."
+    )
+    return [TextContent(type="text", text=text)]
 
 
+@mcp_handler
 async def handle_release_window(ctx: ServerContext, args: dict[str, Any]) -> list[TextContent]:
     """Handle desktop_release_window tool."""
     window_id = args.get("window_id")
@@ -629,7 +793,7 @@ async def handle_release_window(ctx: ServerContext, args: dict[str, Any]) -> lis
         return [TextContent(type="text", text=f"Released {count} windows from all groups")]
 
     if not window_id:
-        return [TextContent(type="text", text="Error: Provide window_id or set release_all=true")]
+        return [_ERR_RELEASE_ARGS]
 
     target = ctx.window_manager.release_window(window_id)
     if target:
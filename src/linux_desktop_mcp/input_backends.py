@@ -89,6 +89,20 @@ class InputBackend(ABC):
         """
         pass
 
+    async def clear_field(self) -> bool:
+        """Select all text in the focused field and delete it.
+
+        Backends that can send several keys in one invocation override this
+        to avoid spawning a process per key.
+
+        Returns:
+            True if the field was cleared.
+        """
+        if not await self.key("a", ["ctrl"]):
+            return False
+        await asyncio.sleep(0.05)
+        return await self.key("Delete")
+
 
 class YdotoolBackend(InputBackend):
     """Input backend using ydotool (works on Wayland and X11)."""
@@ -147,6 +161,9 @@ class YdotoolBackend(InputBackend):
 
         return await self._run("key", key_sequence)
 
+    async def clear_field(self) -> bool:
+        return await self._run("key", "ctrl+a", "Delete")
+
     async def move(self, x: int, y: int) -> bool:
         return await self._run("mousemove", "--absolute", str(x), str(y))
 
@@ -211,6 +228,9 @@ class XdotoolBackend(InputBackend):
 
         return await self._run("key", key_sequence)
 
+    async def clear_field(self) -> bool:
+        return await self._run("key", "--clearmodifiers", "ctrl+a", "Delete")
+
     async def move(self, x: int, y: int) -> bool:
         return await self._run("mousemove", str(x), str(y))
 
@@ -265,6 +285,9 @@ class WtypeBackend(InputBackend):
 
         return await self._run(*args)
 
+    async def clear_field(self) -> bool:
+        return await self._run("-M", "ctrl", "-k", "a", "-m", "ctrl", "-k", "Delete")
+
     async def move(self, x: int, y: int) -> bool:
         logger.warning("wtype does not support mouse movement")
         return False
@@ -377,6 +400,14 @@ class InputManager:
 
         return await self._keyboard_backend.key(key, modifiers)
 
+    async def clear_field(self) -> bool:
+        """Clear the focused text field (select all, then delete)."""
+        if not self._keyboard_backend:
+            logger.error("No keyboard backend available")
+            return False
+
+        return await self._keyboard_backend.clear_field()
+
     async def move(self, x: int, y: int) -> bool:
         """Move mouse to coordinates."""
         if not self._backend:
@@ -392,16 +423,9 @@ class InputManager:
 
         await asyncio.sleep(0.1)
 
-        if not await self.key("a", ["ctrl"]):
+        if not await self.clear_field():
             return False
 
-        await asyncio.sleep(0.05)
-
-        if not await self.key("Delete"):
-            return False
-
-        await asyncio.sleep(0.05)
-
         return await self.type_text(text, delay_ms)
 
     async def type_and_submit(self, ref: ElementReference, text: str, delay_ms: int = 12) -> bool:
@@ -4,11 +4,13 @@ Provides a reference management system similar to Chrome extension's ref_id syst
 allowing semantic element targeting by reference instead of coordinates.
 """
 
+import bisect
+import functools
 import threading
 import time
 from dataclasses import dataclass, field
-from enum import Enum
-from typing import Any, Optional
+from enum import Enum, IntFlag, auto
+from typing import Any, Callable, Iterable, Optional
 
 
 class ElementRole(Enum):
@@ -69,7 +71,25 @@ class ElementRole(Enum):
     UNKNOWN = "unknown"
 
 
-@dataclass
+def _now() -> float:
+    """Monotonic clock used for reference TTLs."""
+    return time.monotonic()
+
+
+# Role names as matched by queries ("menu_item" -> "menu item")
+_ROLE_SEARCH_TEXT = {role: role.value.replace("_", " ") for role in ElementRole}
+
+
+@functools.lru_cache(maxsize=128)
+def role_from_str(value: str) -> ElementRole:
+    """Resolve a role value such as "push_button", falling back to UNKNOWN."""
+    try:
+        return ElementRole(value)
+    except ValueError:
+        return ElementRole.UNKNOWN
+
+
+@dataclass(slots=True)
 class ElementBounds:
     """Screen position and size of an element."""
 
@@ -110,63 +130,131 @@ class ElementBounds:
         return overlap_area / self_area >= threshold
 
 
-@dataclass
+class StateFlag(IntFlag):
+    """One bit per element state, as packed into ``ElementState.bits``."""
+
+    VISIBLE = auto()
+    ENABLED = auto()
+    FOCUSED = auto()
+    SELECTED = auto()
+    CHECKED = auto()
+    EDITABLE = auto()
+    CLICKABLE = auto()
+    SCROLLABLE = auto()
+    EXPANDABLE = auto()
+    EXPANDED = auto()
+    HAS_POPUP = auto()
+    MODAL = auto()
+    MULTI_LINE = auto()
+    REQUIRED = auto()
+    INVALID = auto()
+
+
+# Plain ints so bit tests avoid IntFlag's Python-level operators
+_STATE_BITS = tuple(int(flag) for flag in StateFlag)
+_STATE_FIELDS = tuple(flag.name.lower() for flag in StateFlag)
+
+# (bit, label, reported when the bit is set) in to_list order
+_STATE_LABELS = (
+    (int(StateFlag.VISIBLE), "hidden", False),
+    (int(StateFlag.ENABLED), "disabled", False),
+    *((bit, name, True) for bit, name in zip(_STATE_BITS[2:], _STATE_FIELDS[2:])),
+)
+
+
+def _flag_property(flag: StateFlag) -> property:
+    bit = int(flag)
+
+    def getter(self: "ElementState") -> bool:
+        return bool(self.bits & bit)
+
+    def setter(self: "ElementState", value: bool) -> None:
+        self.bits = self.bits | bit if value else self.bits & ~bit
+
+    return property(getter, setter)
+
+
+@dataclass(slots=True, init=False, repr=False)
 class ElementState:
-    """State flags for an element."""
-
-    visible: bool = True
-    enabled: bool = True
-    focused: bool = False
-    selected: bool = False
-    checked: bool = False
-    editable: bool = False
-    clickable: bool = False
-    scrollable: bool = False
-    expandable: bool = False
-    expanded: bool = False
-    has_popup: bool = False
-    modal: bool = False
-    multi_line: bool = False
-    required: bool = False
-    invalid: bool = False
+    """State flags for an element, packed into a single int of StateFlag bits.
+
+    ``bits`` is the only dataclass field, so ``dataclasses.fields``, ``asdict``
+    and ``replace`` operate on the packed value; each flag is a property.
+    """
+
+    bits: int
+
+    def __init__(
+        self,
+        visible: bool = True,
+        enabled: bool = True,
+        focused: bool = False,
+        selected: bool = False,
+        checked: bool = False,
+        editable: bool = False,
+        clickable: bool = False,
+        scrollable: bool = False,
+        expandable: bool = False,
+        expanded: bool = False,
+        has_popup: bool = False,
+        modal: bool = False,
+        multi_line: bool = False,
+        required: bool = False,
+        invalid: bool = False,
+        *,
+        bits: Optional[int] = None,
+    ) -> None:
+        if bits is not None:
+            self.bits = int(bits)
+            return
+        values = (
+            visible,
+            enabled,
+            focused,
+            selected,
+            checked,
+            editable,
+            clickable,
+            scrollable,
+            expandable,
+            expanded,
+            has_popup,
+            modal,
+            multi_line,
+            required,
+            invalid,
+        )
+        self.bits = sum(bit for bit, value in zip(_STATE_BITS, values) if value)
+
+    visible = _flag_property(StateFlag.VISIBLE)
+    enabled = _flag_property(StateFlag.ENABLED)
+    focused = _flag_property(StateFlag.FOCUSED)
+    selected = _flag_property(StateFlag.SELECTED)
+    checked = _flag_property(StateFlag.CHECKED)
+    editable = _flag_property(StateFlag.EDITABLE)
+    clickable = _flag_property(StateFlag.CLICKABLE)
+    scrollable = _flag_property(StateFlag.SCROLLABLE)
+    expandable = _flag_property(StateFlag.EXPANDABLE)
+    expanded = _flag_property(StateFlag.EXPANDED)
+    has_popup = _flag_property(StateFlag.HAS_POPUP)
+    modal = _flag_property(StateFlag.MODAL)
+    multi_line = _flag_property(StateFlag.MULTI_LINE)
+    required = _flag_property(StateFlag.REQUIRED)
+    invalid = _flag_property(StateFlag.INVALID)
+
+    def __repr__(self) -> str:
+        fields = ", ".join(
+            f"{name}={bool(self.bits & bit)}" for bit, name in zip(_STATE_BITS, _STATE_FIELDS)
+        )
+        return f"ElementState({fields})"
 
     def to_list(self) -> list[str]:
         """Return a list of active state names."""
-        states = []
-        if not self.visible:
-            states.append("hidden")
-        if not self.enabled:
-            states.append("disabled")
-        if self.focused:
-            states.append("focused")
-        if self.selected:
-            states.append("selected")
-        if self.checked:
-            states.append("checked")
-        if self.editable:
-            states.append("editable")
-        if self.clickable:
-            states.append("clickable")
-        if self.scrollable:
-            states.append("scrollable")
-        if self.expandable:
-            states.append("expandable")
-        if self.expanded:
-            states.append("expanded")
-        if self.has_popup:
-            states.append("has_popup")
-        if self.modal:
-            states.append("modal")
-        if self.multi_line:
-            states.append("multi_line")
-        if self.required:
-            states.append("required")
-        if self.invalid:
-            states.append("invalid")
-        return states
+        bits = self.bits
+        return [label for bit, label, when_set in _STATE_LABELS if bool(bits & bit) is when_set]
 
 
-@dataclass
+@dataclass(slots=True)
 class ElementReference:
     """Reference to a UI element."""
 
@@ -191,41 +279,120 @@ class ElementReference:
     app_name: Optional[str] = None
     window_title: Optional[str] = None
     depth: int = 0
-    created_at: float = field(default_factory=time.time)
+    created_at: float = field(default_factory=_now)
+    # Display strings keyed by indent. The bridge's tree cache can hand the
+    # same reference to several snapshots, so both memos are tied to the
+    # ref_id, name, role and state bits they were built from and dropped when
+    # any of those change.
+    _display_cache: dict[int, str] = field(
+        default_factory=dict, init=False, repr=False, compare=False
+    )
+    _state_list: Optional[tuple[str, ...]] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    _cache_key: Optional[tuple[Any, ...]] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+
+    def _sync_display_cache(self) -> None:
+        """Drop memoized display data built from different element fields."""
+        key = (self.ref_id, self.name, self.role, self.state.bits)
+        if key != self._cache_key:
+            self._display_cache.clear()
+            self._state_list = None
+            self._cache_key = key
+
+    @property
+    def state_list(self) -> tuple[str, ...]:
+        """Active state names, recomputed only when the element changes."""
+        self._sync_display_cache()
+        states = self._state_list
+        if states is None:
+            states = self._state_list = tuple(self.state.to_list())
+        return states
 
     def format_for_display(self, indent: int = 0) -> str:
         """Format element for display in snapshot output."""
+        self._sync_display_cache()
+        cached = self._display_cache.get(indent)
+        if cached is not None:
+            return cached
+
         prefix = "  " * indent
         state_str = ""
-        states = self.state.to_list()
+        states = self.state_list
         if states:
             state_str = f" ({', '.join(states)})"
 
         name_str = f' "{self.name}"' if self.name else ""
         role_str = f"[{self.role.value}]"
 
-        return f"{prefix}- {self.ref_id}: {role_str}{name_str}{state_str}"
+        line = f"{prefix}- {self.ref_id}: {role_str}{name_str}{state_str}"
+        self._display_cache[indent] = line
+        return line
 
     def matches_query(self, query: str) -> bool:
         """Check if this element matches a natural language query."""
-        query_lower = query.lower()
+        return _compile_query(query)(self)
 
-        if self.name and query_lower in self.name.lower():
-            return True
 
-        if query_lower in self.role.value.replace("_", " "):
-            return True
+@functools.lru_cache(maxsize=256)
+def _parse_query(query: str) -> tuple[str, frozenset[ElementRole], tuple[str, ...]]:
+    """Split a query into its lowercased needle, implied roles and words."""
+    needle = query.lower()
+    roles = frozenset(role for role, text in _ROLE_SEARCH_TEXT.items() if needle in text)
+    return needle, roles, tuple(needle.split())
+
+
+# Longer tokens (URLs, paths) are not split into suffixes; their references
+# are checked against every query instead
+MAX_INDEXED_TOKEN_LENGTH = 32
+
+
+def _search_suffixes(ref: ElementReference) -> Optional[set[str]]:
+    """Every suffix of the lowercased name and description tokens of a reference.
+
+    A word is a substring of a token exactly when it is a prefix of one of the
+    token's suffixes, which lets substring lookups run as sorted prefix scans.
+    Returns None if any token is longer than MAX_INDEXED_TOKEN_LENGTH.
+    """
+    tokens = f"{ref.name or ''} {ref.description or ''}".lower().split()
+    if any(len(token) > MAX_INDEXED_TOKEN_LENGTH for token in tokens):
+        return None
+    return {token[i:] for token in tokens for i in range(len(token))}
+
 
-        if self.description and query_lower in self.description.lower():
+@functools.lru_cache(maxsize=256)
+def _compile_query(query: str) -> Callable[[ElementReference], bool]:
+    """Build a case-insensitive substring matcher for a query.
+
+    The query is lowercased and matched against every role name once, so the
+    per-element check is a set lookup plus at most two substring searches.
+    """
+    needle, roles, _ = _parse_query(query)
+
+    def matches(ref: ElementReference) -> bool:
+        if ref.role in roles:
             return True
+        name = ref.name
+        if name and needle in name.lower():
+            return True
+        description = ref.description
+        return bool(description) and needle in description.lower()
 
-        return False
+    return matches
 
 
 class ReferenceManager:
     """Manages element references with garbage collection.
 
     References are session-scoped and garbage collected after a timeout.
+
+    ``find_by_query`` uses an inverted index of name and description token
+    suffixes, plus a role index, so it only checks candidate references
+    instead of scanning every one. The suffix index is built on the first
+    query after references change, keeping ``add`` cheap for tree builds that
+    are never searched.
     """
 
     DEFAULT_TTL = 300  # 5 minutes
@@ -233,15 +400,25 @@ class ReferenceManager:
 
     def __init__(self, ttl: float = DEFAULT_TTL):
         self._refs: dict[str, ElementReference] = {}
+        self._order: dict[str, int] = {}
+        # Built lazily by _suffix_lookup; None while stale
+        self._suffix_index: Optional[dict[str, set[str]]] = None
+        self._sorted_suffixes: list[str] = []
+        self._unindexed: set[str] = set()  # refs with over-long tokens
+        self._role_index: dict[ElementRole, set[str]] = {}
+        self._added = 0
         self._counter = 0
         self._lock = threading.Lock()
         self._ttl = ttl
-        self._last_gc = time.time()
+        self._last_gc = _now()
 
     def clear(self) -> None:
         """Clear all references."""
         with self._lock:
             self._refs.clear()
+            self._order.clear()
+            self._suffix_index = None
+            self._role_index.clear()
             self._counter = 0
 
     def generate_ref_id(self) -> str:
@@ -253,13 +430,17 @@ class ReferenceManager:
     def add(self, ref: ElementReference) -> str:
         """Add a reference and return its ID."""
         with self._lock:
+            previous = self._refs.get(ref.ref_id)
+            if previous is not None:
+                self._unindex(previous)
             self._refs[ref.ref_id] = ref
+            self._index(ref)
             return ref.ref_id
 
     def get(self, ref_id: str) -> Optional[ElementReference]:
         """Get a reference by ID, returning None if expired or not found."""
         # Trigger periodic GC
-        now = time.time()
+        now = _now()
         if now - self._last_gc > self.GC_INTERVAL:
             self._gc()
             self._last_gc = now
@@ -269,8 +450,8 @@ class ReferenceManager:
             if ref is None:
                 return None
 
-            if time.time() - ref.created_at > self._ttl:
-                del self._refs[ref_id]
+            if _now() - ref.created_at > self._ttl:
+                self._remove(ref_id)
                 return None
 
             return ref
@@ -283,7 +464,9 @@ class ReferenceManager:
 
     def find_by_role(self, role: ElementRole) -> list[ElementReference]:
         """Find all references with a specific role."""
-        return [ref for ref in self.get_all() if ref.role == role]
+        self._gc()
+        with self._lock:
+            return self._in_order(self._role_index.get(role, ()))
 
     def find_by_name(self, name: str, partial: bool = True) -> list[ElementReference]:
         """Find references by name."""
@@ -298,8 +481,36 @@ class ReferenceManager:
         return results
 
     def find_by_query(self, query: str) -> list[ElementReference]:
-        """Find references matching a natural language query."""
-        return [ref for ref in self.get_all() if ref.matches_query(query)]
+        """Find references matching a natural language query.
+
+        Every query word must be a substring of some name or description
+        token, i.e. a prefix of one of its suffixes. The candidates are the
+        intersection of the postings found by a prefix scan of the sorted
+        suffixes, plus any reference whose role the query implies. Candidates
+        are then confirmed with the full substring matcher.
+        """
+        _, roles, words = _parse_query(query)
+        matches = _compile_query(query)
+        if not words:
+            return [ref for ref in self.get_all() if matches(ref)]
+
+        self._gc()
+        with self._lock:
+            index = self._suffix_lookup()
+            suffixes = self._sorted_suffixes
+            candidates: Optional[set[str]] = None
+            for word in words:
+                postings = set(self._unindexed)
+                i = bisect.bisect_left(suffixes, word)
+                while i < len(suffixes) and suffixes[i].startswith(word):
+                    postings |= index[suffixes[i]]
+                    i += 1
+                candidates = postings if candidates is None else candidates & postings
+                if not candidates:
+                    break
+            for role in roles:
+                candidates |= self._role_index.get(role, set())
+            return [ref for ref in self._in_order(candidates) if matches(ref)]
 
     def find_at_point(self, x: int, y: int) -> list[ElementReference]:
         """Find all elements at a screen coordinate."""
@@ -311,16 +522,71 @@ class ReferenceManager:
 
     def _gc(self) -> int:
         """Garbage collect expired references. Returns count of removed refs."""
-        now = time.time()
+        now = _now()
         expired = []
         with self._lock:
             for ref_id, ref in self._refs.items():
                 if now - ref.created_at > self._ttl:
                     expired.append(ref_id)
             for ref_id in expired:
-                del self._refs[ref_id]
+                self._remove(ref_id)
         return len(expired)
 
+    def _in_order(self, ref_ids: Iterable[str]) -> list[ElementReference]:
+        """Resolve reference IDs in insertion order. Caller holds the lock."""
+        refs = self._refs
+        return [refs[ref_id] for ref_id in sorted(ref_ids, key=self._order.__getitem__)]
+
+    def _suffix_lookup(self) -> dict[str, set[str]]:
+        """Get the suffix index, rebuilding it if stale. Caller holds the lock."""
+        index = self._suffix_index
+        if index is not None:
+            return index
+        index = {}
+        unindexed = set()
+        for ref_id, ref in self._refs.items():
+            suffixes = _search_suffixes(ref)
+            if suffixes is None:
+                unindexed.add(ref_id)
+                continue
+            for suffix in suffixes:
+                ref_ids = index.get(suffix)
+                if ref_ids is None:
+                    index[suffix] = {ref_id}
+                else:
+                    ref_ids.add(ref_id)
+        self._suffix_index = index
+        self._sorted_suffixes = sorted(index)
+        self._unindexed = unindexed
+        return index
+
+    def _index(self, ref: ElementReference) -> None:
+        """Add a reference to the role index. Caller holds the lock.
+
+        A replaced reference keeps its original insertion slot, matching its
+        position in ``_refs``. The suffix index is only marked stale.
+        """
+        ref_id = ref.ref_id
+        if ref_id not in self._order:
+            self._added += 1
+            self._order[ref_id] = self._added
+        self._suffix_index = None
+        self._role_index.setdefault(ref.role, set()).add(ref_id)
+
+    def _unindex(self, ref: ElementReference) -> None:
+        """Drop a reference from the role index. Caller holds the lock."""
+        self._suffix_index = None
+        ref_ids = self._role_index.get(ref.role)
+        if ref_ids is not None:
+            ref_ids.discard(ref.ref_id)
+            if not ref_ids:
+                del self._role_index[ref.role]
+
+    def _remove(self, ref_id: str) -> None:
+        """Remove a reference and its index entries. Caller holds the lock."""
+        self._unindex(self._refs.pop(ref_id))
+        del self._order[ref_id]
+
     def __len__(self) -> int:
         """Return number of active references."""
         self._gc()
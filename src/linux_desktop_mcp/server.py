@@ -25,6 +25,9 @@ from .window_manager import WindowGroupManager
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Dispatch lookup bound once
+_get_handler = HANDLER_MAP.get
+
 
 class LinuxDesktopMCPServer:
     """MCP Server for Linux desktop automation."""
@@ -32,20 +35,39 @@ class LinuxDesktopMCPServer:
     def __init__(self) -> None:
         self._server = Server("linux-desktop-mcp")
         self._ctx = ServerContext()
+        self._initialized = False
+        self._init_lock = asyncio.Lock()
         self._setup_handlers()
+        # Capabilities are derived from the registered handlers, so build after setup
+        self._init_options = self._server.create_initialization_options()
+
+    async def _initialize_once(self) -> None:
+        """Run _ensure_initialized until every available subsystem is up.
+
+        Concurrent calls wait on a lock so the heavy AT-SPI bridge and window
+        discovery objects are created exactly once. Subsystems that failed to
+        start are retried on later calls; once all are up, calls skip the lock.
+        """
+        async with self._init_lock:
+            if not self._initialized:
+                await self._ensure_initialized()
+                self._initialized = self._fully_initialized()
+
+    def _fully_initialized(self) -> bool:
+        """Check that no available subsystem is still missing."""
+        ctx = self._ctx
+        if ATSPI_AVAILABLE and ctx.bridge is None:
+            return False
+        if WINDOW_DISCOVERY_AVAILABLE and ctx.window_discovery is None:
+            return False
+        return not ctx.capabilities or ctx.overlay_manager is not None
 
     async def _ensure_initialized(self) -> bool:
         """Ensure the server is initialized."""
         ctx = self._ctx
 
         if ctx.capabilities is None:
-            ctx.capabilities = detect_capabilities()
-
-        if ctx.bridge is None and ATSPI_AVAILABLE:
-            try:
-                ctx.bridge = ATSPIBridge()
-            except Exception as e:
-                logger.error(f"Failed to initialize AT-SPI bridge: {e}")
+            ctx.capabilities = await asyncio.to_thread(detect_capabilities)
 
         if ctx.input is None:
             ctx.input = InputManager(ctx.capabilities)
@@ -53,6 +75,12 @@ class LinuxDesktopMCPServer:
         if ctx.window_manager is None:
             ctx.window_manager = WindowGroupManager()
 
+        if ctx.bridge is None and ATSPI_AVAILABLE:
+            try:
+                ctx.bridge = ATSPIBridge()
+            except Exception as e:
+                logger.error(f"Failed to initialize AT-SPI bridge: {e}")
+
         if ctx.window_discovery is None and WINDOW_DISCOVERY_AVAILABLE:
             try:
                 ctx.window_discovery = WindowDiscovery()
@@ -77,9 +105,10 @@ class LinuxDesktopMCPServer:
         @self._server.call_tool()
         async def call_tool(name: str, arguments: dict[str, Any]) -> list[TextContent]:
             try:
-                await self._ensure_initialized()
+                if not self._initialized:
+                    await self._initialize_once()
 
-                handler = HANDLER_MAP.get(name)
+                handler = _get_handler(name)
                 if handler is None:
                     return [TextContent(type="text", text=f"Unknown tool: {name}")]
 
@@ -91,15 +120,18 @@ class LinuxDesktopMCPServer:
     async def run(self) -> None:
         """Run the MCP server."""
         async with stdio_server() as (read_stream, write_stream):
-            await self._server.run(
-                read_stream, write_stream, self._server.create_initialization_options()
-            )
+            await self._server.run(read_stream, write_stream, self._init_options)
 
 
 def main() -> None:
     """Entry point for the MCP server."""
     server = LinuxDesktopMCPServer()
-    asyncio.run(server.run())
+    try:
+        import uvloop
+    except ImportError:
+        asyncio.run(server.run())
+    else:
+        uvloop.run(server.run())
 
 
 if __name__ == "__main__":
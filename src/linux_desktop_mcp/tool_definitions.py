@@ -4,16 +4,39 @@ Extracted from server.py for maintainability. Contains all Tool objects
 with their JSON schemas and annotations.
 """
 
+import functools
+
 from mcp.types import Tool, ToolAnnotations
 
+from .atspi_bridge import ATSPIBridge
+
+_CACHE_TTL = f"{ATSPIBridge.TREE_CACHE_TTL:g} seconds"
+
+# Shared by the tools that read the bridge's cached accessibility tree
+_STALENESS_NOTE = (
+    f"Results may come from a tree captured up to {_CACHE_TTL} earlier; "
+    "pass refresh to force a rescan."
+)
+_REFRESH_PROPERTY = {
+    "type": "boolean",
+    "description": f"Rescan instead of reusing a tree captured in the last {_CACHE_TTL} "
+    "(default: false)",
+    "default": False,
+}
 
+
+@functools.lru_cache(maxsize=1)
 def get_tool_definitions() -> list[Tool]:
-    """Return the list of all MCP tool definitions."""
+    """Return the list of all MCP tool definitions.
+
+    The list is built once and shared between calls; callers must not mutate it.
+    """
     return [
         Tool(
             name="desktop_snapshot",
             description="Capture accessibility tree with semantic element references. "
-            "Returns a tree of UI elements with ref IDs that can be used for interaction.",
+            "Returns a tree of UI elements with ref IDs that can be used for interaction. "
+            + _STALENESS_NOTE,
             inputSchema={
                 "type": "object",
                 "properties": {
@@ -26,6 +49,7 @@ def get_tool_definitions() -> list[Tool]:
                         "description": "Maximum tree traversal depth (default: 15)",
                         "default": 15,
                     },
+                    "refresh": _REFRESH_PROPERTY,
                 },
             },
             annotations=ToolAnnotations(readOnlyHint=True),
@@ -33,7 +57,7 @@ def get_tool_definitions() -> list[Tool]:
         Tool(
             name="desktop_find",
             description="Find elements by natural language query. "
-            "Search for buttons, text fields, links, etc. by name or role.",
+            "Search for buttons, text fields, links, etc. by name or role. " + _STALENESS_NOTE,
             inputSchema={
                 "type": "object",
                 "properties": {
@@ -45,6 +69,7 @@ def get_tool_definitions() -> list[Tool]:
                         "type": "string",
                         "description": "Filter to specific application (optional)",
                     },
+                    "refresh": _REFRESH_PROPERTY,
                 },
                 "required": ["query"],
             },
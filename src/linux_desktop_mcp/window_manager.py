@@ -10,7 +10,7 @@ import time
 import uuid
 from dataclasses import dataclass, field
 from enum import Enum
-from typing import Any, Optional
+from typing import Any, ClassVar, Optional
 
 logger = logging.getLogger(__name__)
 
@@ -111,9 +111,18 @@ class WindowGroup:
     active_window_id: Optional[str] = None
     created_at: float = field(default_factory=time.time)
 
+    # validate_windows() skips re-checking for this long after a check unless
+    # the group changes. Callers without force=True can therefore miss a window
+    # closed within the TTL: desktop_snapshot and desktop_find (which then
+    # target it once more) and WindowGroupManager.validate_all_windows.
+    # desktop_context forces the check because it reports removed windows.
+    VALIDATE_TTL: ClassVar[float] = 0.5
+    _validated_at: Optional[float] = field(default=None, init=False, repr=False, compare=False)
+
     def add_window(self, target: WindowTarget) -> None:
         """Add a window to this group."""
         self.windows[target.window_id] = target
+        self.invalidate_validation()
         # First window becomes active automatically
         if self.active_window_id is None:
             self.active_window_id = target.window_id
@@ -123,6 +132,7 @@ class WindowGroup:
         """Remove a window from this group."""
         target = self.windows.pop(window_id, None)
         if target:
+            self.invalidate_validation()
             target.is_active = False
             # If removed window was active, switch to another
             if self.active_window_id == window_id:
@@ -158,14 +168,32 @@ class WindowGroup:
         """Get all windows in this group."""
         return list(self.windows.values())
 
-    def validate_windows(self) -> list[str]:
-        """Check all windows and remove invalid ones. Returns removed window IDs."""
+    def invalidate_validation(self) -> None:
+        """Make the next validate_windows() call check every window."""
+        self._validated_at = None
+
+    def validate_windows(self, force: bool = False) -> list[str]:
+        """Check all windows and remove invalid ones. Returns removed window IDs.
+
+        A check made within VALIDATE_TTL seconds of the previous one is skipped
+        (returning an empty list) unless windows were added or removed since,
+        or ``force`` is set.
+        """
+        now = time.monotonic()
+        if (
+            not force
+            and self._validated_at is not None
+            and now - self._validated_at < self.VALIDATE_TTL
+        ):
+            return []
+
         removed = []
         for window_id, target in list(self.windows.items()):
             if not target.is_valid():
                 self.remove_window(window_id)
                 removed.append(window_id)
                 logger.info(f"Window '{target.window_title}' was closed, removed from group")
+        self._validated_at = now
         return removed
 
     def to_dict(self) -> dict[str, Any]:
@@ -309,6 +337,7 @@ class WindowGroupManager:
                 count += len(group.windows)
                 group.windows.clear()
                 group.active_window_id = None
+                group.invalidate_validation()
         return count
 
     def validate_all_windows(self) -> list[str]:
@@ -1,7 +1,9 @@
 """Pytest configuration and shared fixtures."""
 
 import sys
+import types
 from pathlib import Path
+from types import SimpleNamespace
 from unittest.mock import MagicMock
 
 # Add src to path for imports
@@ -10,16 +12,10 @@ sys.path.insert(0, str(src_path))
 
 # ---------------------------------------------------------------------------
 # Mock MCP modules before any linux_desktop_mcp imports that need them.
-# These are module-level so they take effect at import time.
+# These are module-level so they take effect at import time. Plain modules
+# are used rather than MagicMock so a typo'd attribute fails loudly.
 # ---------------------------------------------------------------------------
 
-_mock_mcp = MagicMock()
-_mock_mcp_server = MagicMock()
-_mock_mcp_server_stdio = MagicMock()
-
-# Create a proper TextContent mock that returns namespace objects
-_mock_mcp_types = MagicMock()
-
 
 class _FakeTextContent:
     """Lightweight stand-in for mcp.types.TextContent."""
@@ -37,14 +33,49 @@ class _FakeTextContent:
         return NotImplemented
 
 
-_mock_mcp_types.TextContent = _FakeTextContent
-_mock_mcp_types.Tool = MagicMock
-_mock_mcp_types.ToolAnnotations = MagicMock
+class _FakeServer:
+    """Stand-in for mcp.server.Server that records registered handlers."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.handlers: dict[str, object] = {}
+
+    def _register(self, kind: str):
+        def decorator(func):
+            self.handlers[kind] = func
+            return func
+
+        return decorator
+
+    def list_tools(self):
+        return self._register("list_tools")
+
+    def call_tool(self):
+        return self._register("call_tool")
+
+    def create_initialization_options(self):
+        return SimpleNamespace()
+
+    async def run(self, *args, **kwargs) -> None:
+        return None
 
-sys.modules["mcp"] = _mock_mcp
-sys.modules["mcp.server"] = _mock_mcp_server
-sys.modules["mcp.server.stdio"] = _mock_mcp_server_stdio
-sys.modules["mcp.types"] = _mock_mcp_types
+
+def _stub_module(name: str, **attrs) -> types.ModuleType:
+    module = types.ModuleType(name)
+    module.__dict__.update(attrs)
+    sys.modules[name] = module
+    return module
+
+
+_stub_module(
+    "mcp.types",
+    TextContent=_FakeTextContent,
+    Tool=SimpleNamespace,
+    ToolAnnotations=SimpleNamespace,
+)
+_stub_module("mcp.server", Server=_FakeServer)
+_stub_module("mcp.server.stdio", stdio_server=None)
+_stub_module("mcp")
 
 
 # ---------------------------------------------------------------------------
@@ -52,8 +83,14 @@ sys.modules["mcp.types"] = _mock_mcp_types
 # ---------------------------------------------------------------------------
 import pytest  # noqa: E402
 
-from linux_desktop_mcp.detection import DisplayServer, PlatformCapabilities  # noqa: E402
+from linux_desktop_mcp.atspi_bridge import ATSPIBridge  # noqa: E402
+from linux_desktop_mcp.detection import (  # noqa: E402
+    DisplayServer,
+    PlatformCapabilities,
+    clear_detection_cache,
+)
 from linux_desktop_mcp.handlers import ServerContext  # noqa: E402
+from linux_desktop_mcp.input_backends import InputManager  # noqa: E402
 from linux_desktop_mcp.references import (  # noqa: E402
     ElementBounds,
     ElementReference,
@@ -65,6 +102,31 @@ from linux_desktop_mcp.window_manager import (  # noqa: E402
     WindowGroupManager,
 )
 
+# -- Event loop --------------------------------------------------------------
+
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+
+if uvloop is not None and sys.platform != "win32":
+
+    def pytest_asyncio_loop_factories(config, item):
+        """Run async tests on uvloop when it is installed."""
+        return {"uvloop": uvloop.new_event_loop}
+
+
+# -- Detection cache ---------------------------------------------------------
+
+
+@pytest.fixture(autouse=True)
+def _fresh_detection_cache():
+    """Keep memoized detection results from leaking between tests."""
+    clear_detection_cache()
+    yield
+    clear_detection_cache()
+
+
 # -- Capability fixtures -----------------------------------------------------
 
 
@@ -122,16 +184,21 @@ def caps_no_tools() -> PlatformCapabilities:
 
 @pytest.fixture
 def mock_bridge() -> MagicMock:
-    """Mock ATSPIBridge with a real ReferenceManager."""
-    bridge = MagicMock()
+    """ATSPIBridge-specced mock with a real ReferenceManager.
+
+    Async bridge methods come back as AsyncMock children, so tests set
+    ``return_value`` on them instead of replacing them.
+    """
+    bridge = MagicMock(spec=ATSPIBridge)
     bridge.ref_manager = ReferenceManager()
+    bridge.refs_for_app.return_value = None  # no cached full-desktop tree
     return bridge
 
 
 @pytest.fixture
 def mock_input_manager() -> MagicMock:
-    """Mock InputManager that reports all abilities available."""
-    mgr = MagicMock()
+    """InputManager-specced mock that reports all abilities available."""
+    mgr = MagicMock(spec=InputManager)
     mgr.can_click = True
     mgr.can_type = True
     mgr.backend_name = "mock"
@@ -169,16 +236,26 @@ def make_ref():
 # -- ServerContext fixture ---------------------------------------------------
 
 
+@pytest.fixture(scope="session")
+def server_caps() -> PlatformCapabilities:
+    """Capabilities shared by every server_ctx. Replace rather than mutate."""
+    return PlatformCapabilities(
+        display_server=DisplayServer.X11,
+        has_atspi=True,
+        atspi_registry_available=True,
+        has_xdotool=True,
+    )
+
+
 @pytest.fixture
-def server_ctx(mock_bridge, mock_input_manager) -> ServerContext:
-    """A ServerContext wired with mock bridge, input, and real window manager."""
+def server_ctx(server_caps, mock_bridge, mock_input_manager) -> ServerContext:
+    """A ServerContext wired with mock bridge, input, and real window manager.
+
+    The bridge, input and window manager are rebuilt per test because most
+    handler tests configure or fill them.
+    """
     return ServerContext(
-        capabilities=PlatformCapabilities(
-            display_server=DisplayServer.X11,
-            has_atspi=True,
-            atspi_registry_available=True,
-            has_xdotool=True,
-        ),
+        capabilities=server_caps,
         bridge=mock_bridge,
         input=mock_input_manager,
         window_manager=WindowGroupManager(),
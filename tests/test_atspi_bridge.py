@@ -0,0 +1,145 @@
+"""Tests for ATSPIBridge tree building and caching.
+
+The bridge is constructed with AT-SPI availability patched on, and the sync
+tree walkers are replaced so no real accessibility bus is needed.
+"""
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from linux_desktop_mcp.atspi_bridge import ATSPIBridge
+
+
+@pytest.fixture
+def bridge():
+    with patch("linux_desktop_mcp.atspi_bridge.ATSPI_AVAILABLE", True):
+        b = ATSPIBridge(max_workers=1)
+    b._build_window_tree_sync = MagicMock(side_effect=lambda acc, depth: [MagicMock()])
+    yield b
+    b._executor.shutdown(wait=False)
+
+
+class TestTreeCache:
+    async def test_repeat_build_reuses_result(self, bridge):
+        window = MagicMock()
+        first = await bridge.build_tree_for_window(window)
+        second = await bridge.build_tree_for_window(window)
+        assert first == second
+        assert bridge._build_window_tree_sync.call_count == 1
+
+    async def test_different_key_rebuilds(self, bridge):
+        await bridge.build_tree_for_window(MagicMock())
+        await bridge.build_tree_for_window(MagicMock())
+        await bridge.build_tree_for_window(MagicMock(), max_depth=3)
+        assert bridge._build_window_tree_sync.call_count == 3
+
+    async def test_invalidate_forces_rebuild(self, bridge):
+        windows = [MagicMock(), MagicMock()]
+        await bridge.build_tree_for_windows(windows)
+        bridge.invalidate_tree_cache()
+        await bridge.build_tree_for_windows(windows)
+        assert bridge._build_window_tree_sync.call_count == 4
+
+    async def test_expired_entry_rebuilds(self, bridge):
+        bridge.TREE_CACHE_TTL = 0
+        window = MagicMock()
+        await bridge.build_tree_for_window(window)
+        await bridge.build_tree_for_window(window)
+        assert bridge._build_window_tree_sync.call_count == 2
+
+
+class TestBuildTree:
+    async def test_walks_matching_apps_in_order(self, bridge):
+        apps = [MagicMock(), MagicMock(), MagicMock()]
+        for app, name in zip(apps, ["Firefox", "gedit", "firefox-nightly"]):
+            app.get_name.return_value = name
+        bridge._get_applications_sync = MagicMock(return_value=apps)
+        bridge._build_tree_sync = MagicMock(side_effect=lambda app, max_depth: [app])
+        refs = await bridge.build_tree(app_name_filter="firefox")
+        assert refs == [apps[0], apps[2]]
+
+    async def test_clears_and_fills_in_one_job(self, bridge, make_ref):
+        bridge.ref_manager.add(make_ref(ref_id="ref_stale"))
+        run_sync = bridge._run_sync
+        jobs = []
+
+        async def counting_run_sync(func, *args):
+            jobs.append(func)
+            return await run_sync(func, *args)
+
+        bridge._run_sync = counting_run_sync
+        bridge._get_applications_sync = MagicMock(return_value=[MagicMock(), MagicMock()])
+        bridge._build_tree_sync = MagicMock(side_effect=lambda app, max_depth: [app])
+        await bridge.build_tree()
+        assert len(jobs) == 1
+        assert bridge.ref_manager.get("ref_stale") is None
+
+
+class _FakeAccessible:
+    """Minimal stand-in for an Atspi.Accessible node."""
+
+    def __init__(self, name, children=()):
+        self._name = name
+        self._children = list(children)
+
+    def get_role(self):
+        return None
+
+    def get_name(self):
+        return self._name
+
+    def get_description(self):
+        return ""
+
+    def get_id(self):
+        return id(self)
+
+    def get_child_count(self):
+        return len(self._children)
+
+    def get_child_at_index(self, i):
+        return self._children[i]
+
+    def __getattr__(self, attr):
+        # get_state_set, get_component_iface, get_action_iface, ...
+        return lambda *args: None
+
+
+class TestBuildTreeSync:
+    def test_links_children_in_order(self, bridge, monkeypatch):
+        monkeypatch.setattr("linux_desktop_mcp.atspi_bridge.Atspi", MagicMock(), raising=False)
+        leaf = _FakeAccessible("leaf")
+        tree = _FakeAccessible(
+            "root", [_FakeAccessible("a", [leaf]), _FakeAccessible("b"), _FakeAccessible("c")]
+        )
+        refs = bridge._build_tree_sync(tree)
+        assert [r.name for r in refs] == ["root", "a", "leaf", "b", "c"]
+        root, a, _, b, c = refs
+        assert root.child_refs == [a.ref_id, b.ref_id, c.ref_id]
+        assert a.child_refs == [refs[2].ref_id]
+        assert refs[2].parent_ref == a.ref_id
+
+    def test_max_depth(self, bridge, monkeypatch):
+        monkeypatch.setattr("linux_desktop_mcp.atspi_bridge.Atspi", MagicMock(), raising=False)
+        tree = _FakeAccessible("root", [_FakeAccessible("a", [_FakeAccessible("leaf")])])
+        refs = bridge._build_tree_sync(tree, max_depth=1)
+        assert [r.name for r in refs] == ["root", "a"]
+        assert refs[1].child_refs == []
+
+
+class TestRefsForApp:
+    async def test_slices_fresh_desktop_build(self, bridge):
+        refs = [
+            MagicMock(app_name="Firefox"),
+            MagicMock(app_name="gedit"),
+            MagicMock(app_name="Firefox"),
+        ]
+        bridge._get_applications_sync = MagicMock(return_value=[MagicMock()])
+        bridge._build_app_tree_sync = MagicMock(return_value=refs)
+        await bridge.build_tree()
+        assert bridge.refs_for_app("firefox") == [refs[0], refs[2]]
+        assert bridge.refs_for_app("firefox", max_depth=3) is None
+
+    def test_no_cached_build(self, bridge):
+        assert bridge.refs_for_app("firefox") is None
@@ -199,3 +199,9 @@ class TestCheckCommandExists:
     def test_command_not_found(self):
         with patch("shutil.which", return_value=None):
             assert _check_command_exists("nonexistent") is False
+
+    def test_result_memoized(self):
+        with patch("shutil.which", return_value="/usr/bin/xdotool") as mock_which:
+            assert _check_command_exists("xdotool") is True
+            assert _check_command_exists("xdotool") is True
+            assert mock_which.call_count == 1
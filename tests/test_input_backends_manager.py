@@ -1,245 +1,240 @@
 """Tests for InputManager and backend selection logic.
 
-Mocks asyncio.create_subprocess_exec to avoid needing real input tools.
+Monkeypatches asyncio.create_subprocess_exec to avoid needing real input tools.
 """
 
-from unittest.mock import AsyncMock, patch
+import asyncio
 
 import pytest
 
 from linux_desktop_mcp.detection import DisplayServer, PlatformCapabilities
 from linux_desktop_mcp.input_backends import (
+    MAX_TEXT_LENGTH,
     InputManager,
     WtypeBackend,
     XdotoolBackend,
     YdotoolBackend,
 )
 
-# ---------------------------------------------------------------------------
-# InputManager backend selection
-# ---------------------------------------------------------------------------
+# Capability permutations used below; built once at import. InputManager
+# only reads them.
+CAPS_WAYLAND_YDOTOOL = PlatformCapabilities(display_server=DisplayServer.WAYLAND, has_ydotool=True)
+CAPS_WAYLAND_WTYPE = PlatformCapabilities(display_server=DisplayServer.WAYLAND, has_wtype=True)
+CAPS_WAYLAND_NONE = PlatformCapabilities(display_server=DisplayServer.WAYLAND)
+CAPS_X11_XDOTOOL = PlatformCapabilities(display_server=DisplayServer.X11, has_xdotool=True)
+CAPS_X11_YDOTOOL = PlatformCapabilities(display_server=DisplayServer.X11, has_ydotool=True)
+CAPS_X11_NONE = PlatformCapabilities(display_server=DisplayServer.X11)
+CAPS_X11_BOTH = PlatformCapabilities(
+    display_server=DisplayServer.X11, has_xdotool=True, has_ydotool=True
+)
 
+# One character over InputManager's limit; built once at import
+_LONG_TEXT = "x" * (MAX_TEXT_LENGTH + 1)
 
-class TestInputManagerBackendSelection:
-    def test_wayland_ydotool(self):
-        caps = PlatformCapabilities(display_server=DisplayServer.WAYLAND, has_ydotool=True)
-        mgr = InputManager(caps)
-        assert mgr.backend_name == "ydotool"
-        assert mgr.can_click is True
-        assert mgr.can_type is True
+# Backends and a backend-less manager hold no per-call state, so one instance
+# per module is shared by the tests below.
 
-    def test_wayland_wtype_only(self):
-        caps = PlatformCapabilities(display_server=DisplayServer.WAYLAND, has_wtype=True)
-        mgr = InputManager(caps)
-        assert mgr.can_click is False  # wtype can't click
-        assert mgr.can_type is True
 
-    def test_wayland_no_tools(self):
-        caps = PlatformCapabilities(display_server=DisplayServer.WAYLAND)
-        mgr = InputManager(caps)
-        assert mgr.can_click is False
-        assert mgr.can_type is False
+@pytest.fixture(scope="module")
+def no_backend_mgr() -> InputManager:
+    return InputManager(CAPS_X11_NONE)
 
-    def test_x11_xdotool(self):
-        caps = PlatformCapabilities(display_server=DisplayServer.X11, has_xdotool=True)
-        mgr = InputManager(caps)
-        assert mgr.backend_name == "xdotool"
-        assert mgr.can_click is True
 
-    def test_x11_ydotool_fallback(self):
-        caps = PlatformCapabilities(display_server=DisplayServer.X11, has_ydotool=True)
-        mgr = InputManager(caps)
-        assert mgr.backend_name == "ydotool"
+@pytest.fixture(scope="module")
+def ydotool() -> YdotoolBackend:
+    return YdotoolBackend()
 
-    def test_x11_no_tools(self):
-        caps = PlatformCapabilities(display_server=DisplayServer.X11)
-        mgr = InputManager(caps)
-        assert mgr.can_click is False
-        assert mgr.can_type is False
 
-    def test_x11_prefers_xdotool_over_ydotool(self):
-        caps = PlatformCapabilities(
-            display_server=DisplayServer.X11, has_xdotool=True, has_ydotool=True
-        )
-        mgr = InputManager(caps)
-        assert mgr.backend_name == "xdotool"
+@pytest.fixture(scope="module")
+def xdotool() -> XdotoolBackend:
+    return XdotoolBackend()
+
+
+@pytest.fixture(scope="module")
+def wtype() -> WtypeBackend:
+    return WtypeBackend()
 
 
 # ---------------------------------------------------------------------------
-# InputManager delegation
+# InputManager backend selection
 # ---------------------------------------------------------------------------
 
 
-class TestInputManagerDelegation:
-    @pytest.mark.asyncio
-    async def test_click_no_backend(self):
-        caps = PlatformCapabilities(display_server=DisplayServer.X11)
+class TestInputManagerBackendSelection:
+    @pytest.mark.parametrize(
+        "caps, expected",
+        [
+            pytest.param(
+                CAPS_WAYLAND_YDOTOOL,
+                {"backend_name": "ydotool", "can_click": True, "can_type": True},
+                id="wayland+ydotool",
+            ),
+            pytest.param(
+                CAPS_WAYLAND_WTYPE,
+                {"can_click": False, "can_type": True},  # wtype can't click
+                id="wayland+wtype",
+            ),
+            pytest.param(
+                CAPS_WAYLAND_NONE,
+                {"can_click": False, "can_type": False},
+                id="wayland",
+            ),
+            pytest.param(
+                CAPS_X11_XDOTOOL,
+                {"backend_name": "xdotool", "can_click": True},
+                id="x11+xdotool",
+            ),
+            pytest.param(CAPS_X11_YDOTOOL, {"backend_name": "ydotool"}, id="x11+ydotool"),
+            pytest.param(
+                CAPS_X11_NONE,
+                {"can_click": False, "can_type": False},
+                id="x11",
+            ),
+            pytest.param(CAPS_X11_BOTH, {"backend_name": "xdotool"}, id="x11+xdotool+ydotool"),
+        ],
+    )
+    def test_selection(self, caps, expected):
         mgr = InputManager(caps)
-        result = await mgr.click(100, 200)
-        assert result is False
+        for attr, value in expected.items():
+            assert getattr(mgr, attr) == value, attr
 
-    @pytest.mark.asyncio
-    async def test_type_no_backend(self):
-        caps = PlatformCapabilities(display_server=DisplayServer.X11)
-        mgr = InputManager(caps)
-        result = await mgr.type_text("hello")
-        assert result is False
 
-    @pytest.mark.asyncio
-    async def test_key_no_backend(self):
-        caps = PlatformCapabilities(display_server=DisplayServer.X11)
-        mgr = InputManager(caps)
-        result = await mgr.key("Return")
-        assert result is False
+# ---------------------------------------------------------------------------
+# InputManager delegation
+# ---------------------------------------------------------------------------
 
-    @pytest.mark.asyncio
-    async def test_move_no_backend(self):
-        caps = PlatformCapabilities(display_server=DisplayServer.X11)
-        mgr = InputManager(caps)
-        result = await mgr.move(100, 200)
+
+class TestInputManagerDelegation:
+    @pytest.mark.parametrize(
+        "method, args",
+        [
+            pytest.param("click", (100, 200), id="click"),
+            pytest.param("type_text", ("hello",), id="type"),
+            pytest.param("key", ("Return",), id="key"),
+            pytest.param("clear_field", (), id="clear_field"),
+            pytest.param("move", (100, 200), id="move"),
+        ],
+    )
+    async def test_no_backend(self, no_backend_mgr, method, args):
+        result = await getattr(no_backend_mgr, method)(*args)
         assert result is False
 
-    @pytest.mark.asyncio
     async def test_type_text_too_long(self):
-        caps = PlatformCapabilities(display_server=DisplayServer.X11, has_xdotool=True)
-        mgr = InputManager(caps)
-        result = await mgr.type_text("x" * 10001)
+        mgr = InputManager(CAPS_X11_XDOTOOL)
+        result = await mgr.type_text(_LONG_TEXT)
         assert result is False
 
 
 # ---------------------------------------------------------------------------
-# YdotoolBackend
+# Subprocess fake
 # ---------------------------------------------------------------------------
 
 
-def _mock_subprocess_success():
-    """Create a mock subprocess that returns success."""
-    proc = AsyncMock()
-    proc.returncode = 0
-    proc.communicate = AsyncMock(return_value=(b"", b""))
-    return proc
+class _FakeProc:
+    """Just enough of asyncio.subprocess.Process for the backends' _run."""
 
+    __slots__ = ("returncode", "stderr")
 
-def _mock_subprocess_failure():
-    """Create a mock subprocess that returns failure."""
-    proc = AsyncMock()
-    proc.returncode = 1
-    proc.communicate = AsyncMock(return_value=(b"", b"error"))
-    return proc
+    def __init__(self, returncode: int = 0, stderr: bytes = b""):
+        self.returncode = returncode
+        self.stderr = stderr
 
+    async def communicate(self) -> tuple[bytes, bytes]:
+        return b"", self.stderr
 
-class TestYdotoolBackend:
-    def test_button_map(self):
-        assert YdotoolBackend.BUTTON_MAP["left"] == 0x110
-        assert YdotoolBackend.BUTTON_MAP["right"] == 0x111
-        assert YdotoolBackend.BUTTON_MAP["middle"] == 0x112
 
-    def test_name(self):
-        assert YdotoolBackend().name == "ydotool"
-
-    @pytest.mark.asyncio
-    async def test_move(self):
-        backend = YdotoolBackend()
-        with patch("asyncio.create_subprocess_exec", return_value=_mock_subprocess_success()):
-            result = await backend.move(100, 200)
-            assert result is True
-
-    @pytest.mark.asyncio
-    async def test_type_text(self):
-        backend = YdotoolBackend()
-        with patch("asyncio.create_subprocess_exec", return_value=_mock_subprocess_success()):
-            result = await backend.type_text("hello")
-            assert result is True
-
-    @pytest.mark.asyncio
-    async def test_key_with_modifiers(self):
-        backend = YdotoolBackend()
-        with patch("asyncio.create_subprocess_exec", return_value=_mock_subprocess_success()):
-            result = await backend.key("c", ["ctrl"])
-            assert result is True
-
-    @pytest.mark.asyncio
-    async def test_run_failure(self):
-        backend = YdotoolBackend()
-        with patch("asyncio.create_subprocess_exec", return_value=_mock_subprocess_failure()):
-            result = await backend.move(0, 0)
-            assert result is False
-
-    @pytest.mark.asyncio
-    async def test_run_os_error(self):
-        backend = YdotoolBackend()
-        with patch("asyncio.create_subprocess_exec", side_effect=FileNotFoundError):
-            result = await backend.move(0, 0)
-            assert result is False
+@pytest.fixture
+def set_result(monkeypatch):
+    """Patch asyncio.create_subprocess_exec with one reusable fake process.
+
+    The process succeeds by default; call ``set_result(returncode, stderr)``
+    to change what it reports. ``set_result.calls`` records each argv.
+    """
+    proc = _FakeProc()
+    calls: list[tuple] = []
+
+    async def fake_exec(*args, **kwargs):
+        calls.append(args)
+        return proc
+
+    def _set_result(returncode: int, stderr: bytes = b"") -> None:
+        proc.returncode = returncode
+        proc.stderr = stderr
+
+    monkeypatch.setattr(asyncio, "create_subprocess_exec", fake_exec)
+    _set_result.calls = calls
+    return _set_result
 
 
 # ---------------------------------------------------------------------------
-# XdotoolBackend
+# Backends
 # ---------------------------------------------------------------------------
 
 
-class TestXdotoolBackend:
-    def test_button_map(self):
-        assert XdotoolBackend.BUTTON_MAP["left"] == "1"
-        assert XdotoolBackend.BUTTON_MAP["right"] == "3"
-        assert XdotoolBackend.BUTTON_MAP["middle"] == "2"
+# Select-all-and-delete, sent by each backend as one process
+_CLEAR_FIELD_ARGV = {
+    "ydotool": ("ydotool", "key", "ctrl+a", "Delete"),
+    "xdotool": ("xdotool", "key", "--clearmodifiers", "ctrl+a", "Delete"),
+    "wtype": ("wtype", "-M", "ctrl", "-k", "a", "-m", "ctrl", "-k", "Delete"),
+}
 
-    def test_name(self):
-        assert XdotoolBackend().name == "xdotool"
 
-    @pytest.mark.asyncio
-    async def test_type_text(self):
-        backend = XdotoolBackend()
-        with patch("asyncio.create_subprocess_exec", return_value=_mock_subprocess_success()):
-            result = await backend.type_text("test")
-            assert result is True
+@pytest.fixture(params=["ydotool", "xdotool", "wtype"])
+def backend(request):
+    """Each backend in turn, reusing the module-scoped instances."""
+    return request.getfixturevalue(request.param)
 
-    @pytest.mark.asyncio
-    async def test_key_simple(self):
-        backend = XdotoolBackend()
-        with patch("asyncio.create_subprocess_exec", return_value=_mock_subprocess_success()):
-            result = await backend.key("Return")
-            assert result is True
 
-    @pytest.mark.asyncio
-    async def test_key_with_modifiers(self):
-        backend = XdotoolBackend()
-        with patch("asyncio.create_subprocess_exec", return_value=_mock_subprocess_success()):
-            result = await backend.key("s", ["ctrl"])
-            assert result is True
+class TestBackend:
+    """Behaviour shared by every backend, with wtype's missing pointer support."""
 
+    def test_name(self, backend, request):
+        assert backend.name == request.node.callspec.params["backend"]
 
-# ---------------------------------------------------------------------------
-# WtypeBackend
-# ---------------------------------------------------------------------------
+    async def test_type_text(self, set_result, backend):
+        assert await backend.type_text("hello") is True
 
+    async def test_key_simple(self, set_result, backend):
+        assert await backend.key("Return") is True
 
-class TestWtypeBackend:
-    def test_name(self):
-        assert WtypeBackend().name == "wtype"
+    async def test_key_with_modifiers(self, set_result, backend):
+        assert await backend.key("s", ["ctrl", "shift"]) is True
 
-    @pytest.mark.asyncio
-    async def test_click_returns_false(self):
-        backend = WtypeBackend()
-        result = await backend.click(100, 200)
-        assert result is False
+    async def test_move(self, set_result, backend):
+        # wtype is keyboard-only
+        assert await backend.move(100, 200) is (backend.name != "wtype")
 
-    @pytest.mark.asyncio
-    async def test_move_returns_false(self):
-        backend = WtypeBackend()
-        result = await backend.move(100, 200)
-        assert result is False
+    async def test_clear_field_single_invocation(self, set_result, backend):
+        assert await backend.clear_field() is True
+        assert set_result.calls == [_CLEAR_FIELD_ARGV[backend.name]]
+
+    async def test_run_failure(self, set_result, backend):
+        set_result(1, b"error")
+        assert await backend.type_text("hello") is False
+
+    async def test_run_os_error(self, backend, monkeypatch):
+        async def missing_binary(*args, **kwargs):
+            raise FileNotFoundError(args[0])
+
+        monkeypatch.setattr(asyncio, "create_subprocess_exec", missing_binary)
+        assert await backend.type_text("hello") is False
 
-    @pytest.mark.asyncio
-    async def test_type_text(self):
-        backend = WtypeBackend()
-        with patch("asyncio.create_subprocess_exec", return_value=_mock_subprocess_success()):
-            result = await backend.type_text("hello")
-            assert result is True
-
-    @pytest.mark.asyncio
-    async def test_key_with_modifiers(self):
-        backend = WtypeBackend()
-        with patch("asyncio.create_subprocess_exec", return_value=_mock_subprocess_success()):
-            result = await backend.key("a", ["ctrl", "shift"])
-            assert result is True
+
+class TestYdotoolBackend:
+    def test_button_map(self):
+        assert YdotoolBackend.BUTTON_MAP["left"] == 0x110
+        assert YdotoolBackend.BUTTON_MAP["right"] == 0x111
+        assert YdotoolBackend.BUTTON_MAP["middle"] == 0x112
+
+
+class TestXdotoolBackend:
+    def test_button_map(self):
+        assert XdotoolBackend.BUTTON_MAP["left"] == "1"
+        assert XdotoolBackend.BUTTON_MAP["right"] == "3"
+        assert XdotoolBackend.BUTTON_MAP["middle"] == "2"
+
+
+class TestWtypeBackend:
+    async def test_click_returns_false(self, wtype):
+        result = await wtype.click(100, 200)
+        assert result is False
@@ -3,9 +3,13 @@
 Tests NoOverlayBackend (pure Python) and OverlayManager backend selection logic.
 """
 
-from linux_desktop_mcp.overlay import NoOverlayBackend
+from linux_desktop_mcp.detection import DisplayServer
+from linux_desktop_mcp.overlay import NoOverlayBackend, OverlayManager
 from linux_desktop_mcp.window_manager import GroupColor, WindowGeometry
 
+# Shared read-only geometry; the backends never mutate it
+GEOM_800x600 = WindowGeometry(x=0, y=0, width=800, height=600)
+
 # ---------------------------------------------------------------------------
 # NoOverlayBackend
 # ---------------------------------------------------------------------------
@@ -18,8 +22,7 @@ class TestNoOverlayBackend:
 
     def test_show_border_returns_false(self):
         backend = NoOverlayBackend()
-        geom = WindowGeometry(x=0, y=0, width=800, height=600)
-        assert backend.show_border("win_1", geom, GroupColor.BLUE) is False
+        assert backend.show_border("win_1", GEOM_800x600, GroupColor.BLUE) is False
 
     def test_hide_border_returns_true(self):
         backend = NoOverlayBackend()
@@ -31,8 +34,7 @@ class TestNoOverlayBackend:
 
     def test_update_border_position_returns_false(self):
         backend = NoOverlayBackend()
-        geom = WindowGeometry(x=0, y=0, width=800, height=600)
-        assert backend.update_border_position("win_1", geom) is False
+        assert backend.update_border_position("win_1", GEOM_800x600) is False
 
     def test_custom_reason(self):
         backend = NoOverlayBackend(reason="GNOME Wayland")
@@ -50,37 +52,21 @@ class TestNoOverlayBackend:
 
 class TestOverlayManagerBackendSelection:
     def test_unknown_display_gets_no_overlay(self):
-        from linux_desktop_mcp.detection import DisplayServer
-        from linux_desktop_mcp.overlay import OverlayManager
-
         mgr = OverlayManager(DisplayServer.UNKNOWN)
         assert mgr.has_visual_support is False
 
     def test_wayland_without_layer_shell_gets_no_overlay(self):
-        from linux_desktop_mcp.detection import DisplayServer
-        from linux_desktop_mcp.overlay import OverlayManager
-
         mgr = OverlayManager(DisplayServer.WAYLAND)
         assert isinstance(mgr.backend, NoOverlayBackend)
 
     def test_show_border_delegates_to_backend(self):
-        from linux_desktop_mcp.detection import DisplayServer
-        from linux_desktop_mcp.overlay import OverlayManager
-
         mgr = OverlayManager(DisplayServer.UNKNOWN)
-        geom = WindowGeometry(x=0, y=0, width=800, height=600)
-        assert mgr.show_border("win_1", geom, GroupColor.BLUE) is False
+        assert mgr.show_border("win_1", GEOM_800x600, GroupColor.BLUE) is False
 
     def test_hide_border_delegates(self):
-        from linux_desktop_mcp.detection import DisplayServer
-        from linux_desktop_mcp.overlay import OverlayManager
-
         mgr = OverlayManager(DisplayServer.UNKNOWN)
         assert mgr.hide_border("win_1") is True  # NoOverlay returns True
 
     def test_hide_all_borders_delegates(self):
-        from linux_desktop_mcp.detection import DisplayServer
-        from linux_desktop_mcp.overlay import OverlayManager
-
         mgr = OverlayManager(DisplayServer.UNKNOWN)
         mgr.hide_all_borders()  # Should not raise
@@ -1,15 +1,71 @@
 """Tests for the reference manager module."""
 
-import time
+import dataclasses
 
+import pytest
+
+from linux_desktop_mcp import references
 from linux_desktop_mcp.references import (
     ElementBounds,
     ElementReference,
     ElementRole,
     ElementState,
     ReferenceManager,
+    StateFlag,
+    role_from_str,
 )
 
+# Shared read-only bounds for references under test
+BOUNDS_100x30 = ElementBounds(x=0, y=0, width=100, height=30)
+BOUNDS_50x50 = ElementBounds(x=100, y=100, width=50, height=50)
+
+_DEFAULTS = {
+    "ref_id": "ref_1",
+    "source": "atspi",
+    "role": ElementRole.BUTTON,
+    "name": "Test Button",
+    "bounds": BOUNDS_100x30,
+    "state": ElementState(),
+}
+
+
+def _make_ref(**overrides) -> ElementReference:
+    """Create a test reference from shared defaults."""
+    return ElementReference(**{**_DEFAULTS, **overrides})
+
+
+class _FakeClock:
+    """Manually advanced stand-in for time.monotonic."""
+
+    def __init__(self, start: float = 1000.0):
+        self.now = start
+
+    def advance(self, seconds: float) -> None:
+        self.now += seconds
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch) -> _FakeClock:
+    """Drive reference TTLs from a fake clock instead of sleeping."""
+    fake = _FakeClock()
+    monkeypatch.setattr(references, "time", fake)
+    return fake
+
+
+class TestRoleFromStr:
+    """Tests for role_from_str."""
+
+    def test_known_role(self):
+        """Test role values resolve to their enum member."""
+        assert role_from_str("menu_item") is ElementRole.MENU_ITEM
+
+    def test_unknown_role(self):
+        """Test unmapped values fall back to UNKNOWN."""
+        assert role_from_str("hologram") is ElementRole.UNKNOWN
+
 
 class TestElementBounds:
     """Tests for ElementBounds class."""
@@ -19,52 +75,33 @@ class TestElementBounds:
         bounds = ElementBounds(x=100, y=200, width=50, height=30)
         assert bounds.center == (125, 215)
 
-    def test_is_valid_positive(self):
-        """Test valid bounds detection."""
-        bounds = ElementBounds(x=0, y=0, width=100, height=100)
-        assert bounds.is_valid is True
-
-    def test_is_valid_zero_width(self):
-        """Test invalid bounds with zero width."""
-        bounds = ElementBounds(x=0, y=0, width=0, height=100)
-        assert bounds.is_valid is False
-
-    def test_is_valid_zero_height(self):
-        """Test invalid bounds with zero height."""
-        bounds = ElementBounds(x=0, y=0, width=100, height=0)
-        assert bounds.is_valid is False
-
-    def test_is_valid_negative_x(self):
-        """Test invalid bounds with negative x."""
-        bounds = ElementBounds(x=-1, y=0, width=100, height=100)
-        assert bounds.is_valid is False
-
-    def test_is_valid_negative_y(self):
-        """Test invalid bounds with negative y."""
-        bounds = ElementBounds(x=0, y=-1, width=100, height=100)
-        assert bounds.is_valid is False
-
-    def test_is_valid_overflow_width(self):
-        """Test invalid bounds with overflow width."""
-        bounds = ElementBounds(x=0, y=0, width=70000, height=100)
-        assert bounds.is_valid is False
-
-    def test_contains_point_inside(self):
-        """Test point containment for point inside bounds."""
-        bounds = ElementBounds(x=100, y=100, width=50, height=50)
-        assert bounds.contains_point(125, 125) is True
-
-    def test_contains_point_outside(self):
-        """Test point containment for point outside bounds."""
-        bounds = ElementBounds(x=100, y=100, width=50, height=50)
-        assert bounds.contains_point(50, 50) is False
-
-    def test_contains_point_edge(self):
-        """Test point containment for point on edge."""
-        bounds = ElementBounds(x=100, y=100, width=50, height=50)
-        assert bounds.contains_point(100, 100) is True
-        assert bounds.contains_point(149, 149) is True
-        assert bounds.contains_point(150, 150) is False
+    @pytest.mark.parametrize(
+        "x, y, width, height, expected",
+        [
+            pytest.param(0, 0, 100, 100, True, id="positive"),
+            pytest.param(0, 0, 0, 100, False, id="zero_width"),
+            pytest.param(0, 0, 100, 0, False, id="zero_height"),
+            pytest.param(-1, 0, 100, 100, False, id="negative_x"),
+            pytest.param(0, -1, 100, 100, False, id="negative_y"),
+            pytest.param(0, 0, 70000, 100, False, id="overflow_width"),
+        ],
+    )
+    def test_is_valid(self, x, y, width, height, expected):
+        bounds = ElementBounds(x=x, y=y, width=width, height=height)
+        assert bounds.is_valid is expected
+
+    @pytest.mark.parametrize(
+        "px, py, expected",
+        [
+            pytest.param(125, 125, True, id="inside"),
+            pytest.param(50, 50, False, id="outside"),
+            pytest.param(100, 100, True, id="top_left_edge"),
+            pytest.param(149, 149, True, id="bottom_right_inside"),
+            pytest.param(150, 150, False, id="bottom_right_exclusive"),
+        ],
+    )
+    def test_contains_point(self, px, py, expected):
+        assert BOUNDS_50x50.contains_point(px, py) is expected
 
 
 class TestElementState:
@@ -90,6 +127,31 @@ class TestElementState:
         state = ElementState(visible=False)
         assert "hidden" in state.to_list()
 
+    def test_flags_packed_into_bits(self):
+        """Test flags round-trip through the packed bitfield."""
+        state = ElementState(focused=True)
+        assert state.bits == StateFlag.VISIBLE | StateFlag.ENABLED | StateFlag.FOCUSED
+        state.focused = False
+        state.expanded = True
+        assert state.focused is False and state.expanded is True
+        assert state == ElementState(expanded=True)
+        assert "expanded=True" in repr(state)
+
+    def test_dataclass_protocol(self):
+        """Test dataclasses helpers work on the packed bits."""
+        state = ElementState(focused=True)
+        assert [f.name for f in dataclasses.fields(state)] == ["bits"]
+        assert dataclasses.asdict(state) == {"bits": state.bits}
+        assert dataclasses.replace(state, bits=state.bits | StateFlag.CHECKED) == ElementState(
+            focused=True, checked=True
+        )
+        assert ElementState.__hash__ is None
+
+    def test_to_list_order(self):
+        """Test to_list reports inverted flags first, then set flags in order."""
+        state = ElementState(visible=False, invalid=True, editable=True, enabled=False)
+        assert state.to_list() == ["hidden", "disabled", "editable", "invalid"]
+
     def test_to_list_multiple_states(self):
         """Test to_list with multiple states."""
         state = ElementState(focused=True, editable=True, checked=True)
@@ -102,63 +164,86 @@ class TestElementState:
 class TestElementReference:
     """Tests for ElementReference class."""
 
-    def create_ref(self, **kwargs) -> ElementReference:
-        """Create a test reference with default values."""
-        defaults = {
-            "ref_id": "ref_1",
-            "source": "atspi",
-            "role": ElementRole.BUTTON,
-            "name": "Test Button",
-            "bounds": ElementBounds(x=0, y=0, width=100, height=30),
-            "state": ElementState(),
-        }
-        defaults.update(kwargs)
-        return ElementReference(**defaults)
-
     def test_matches_query_by_name(self):
         """Test query matching by element name."""
-        ref = self.create_ref(name="Save Button")
+        ref = _make_ref(name="Save Button")
         assert ref.matches_query("save") is True
         assert ref.matches_query("button") is True
         assert ref.matches_query("delete") is False
 
     def test_matches_query_by_role(self):
         """Test query matching by element role."""
-        ref = self.create_ref(role=ElementRole.BUTTON)
+        ref = _make_ref(role=ElementRole.BUTTON)
         assert ref.matches_query("button") is True
 
     def test_matches_query_by_description(self):
         """Test query matching by description."""
-        ref = self.create_ref(description="Saves the document")
+        ref = _make_ref(description="Saves the document")
         assert ref.matches_query("document") is True
 
+    def test_matches_query_case_insensitive(self):
+        """Test queries match regardless of case, including multi-word roles."""
+        ref = _make_ref(name="Open File", role=ElementRole.MENU_ITEM)
+        assert ref.matches_query("OPEN") is True
+        assert ref.matches_query("Menu Item") is True
+        assert ref.matches_query("menu_item") is False
+
     def test_format_for_display(self):
         """Test display formatting."""
-        ref = self.create_ref(name="Test", role=ElementRole.BUTTON)
+        ref = _make_ref(name="Test", role=ElementRole.BUTTON)
         formatted = ref.format_for_display()
         assert "ref_1" in formatted
         assert "[button]" in formatted
         assert '"Test"' in formatted
 
+    def test_format_for_display_cached_per_indent(self):
+        """Test display strings are memoized per indent level."""
+        ref = _make_ref(state=ElementState(focused=True))
+        assert ref.format_for_display(1) is ref.format_for_display(1)
+        assert ref.format_for_display(2).startswith("    - ref_1")
+        assert "(focused)" in ref.format_for_display(0)
+
+    def test_display_follows_state_changes(self):
+        """Test memoized display data is rebuilt after the state changes."""
+        ref = _make_ref(state=ElementState(focused=True))
+        assert ref.format_for_display() == '- ref_1: [button] "Test Button" (focused)'
+        ref.state.focused = False
+        ref.state.checked = True
+        assert ref.state_list == ("checked",)
+        assert ref.format_for_display() == '- ref_1: [button] "Test Button" (checked)'
+        ref.state = ElementState()
+        assert ref.format_for_display() == '- ref_1: [button] "Test Button"'
+
+    def test_display_follows_name_and_role_changes(self):
+        """Test memoized display lines are rebuilt after name or role changes."""
+        ref = _make_ref()
+        assert ref.format_for_display() == '- ref_1: [button] "Test Button"'
+        ref.name = "Renamed"
+        assert ref.format_for_display() == '- ref_1: [button] "Renamed"'
+        ref.role = ElementRole.LINK
+        assert ref.format_for_display() == '- ref_1: [link] "Renamed"'
+
+    def test_state_list(self):
+        """Test state_list mirrors ElementState.to_list."""
+        ref = _make_ref(state=ElementState(editable=True))
+        assert ref.state_list == ("editable",)
+        assert ref.state_list is ref.state_list
+
+    def test_slots(self):
+        """Test references carry no per-instance __dict__."""
+        ref = _make_ref()
+        assert not hasattr(ref, "__dict__")
+        assert not hasattr(ref.bounds, "__dict__")
+        assert not hasattr(ref.state, "__dict__")
+
 
 class TestReferenceManager:
     """Tests for ReferenceManager class."""
 
-    def create_ref(self, ref_id: str, name: str = "Test") -> ElementReference:
-        """Create a test reference."""
-        return ElementReference(
-            ref_id=ref_id,
-            source="atspi",
-            role=ElementRole.BUTTON,
-            name=name,
-            bounds=ElementBounds(x=0, y=0, width=100, height=30),
-            state=ElementState(),
-        )
-
     def test_add_and_get(self):
         """Test adding and retrieving references."""
         manager = ReferenceManager()
-        ref = self.create_ref("ref_1")
+        ref = _make_ref(ref_id="ref_1")
         manager.add(ref)
         retrieved = manager.get("ref_1")
         assert retrieved is not None
@@ -181,17 +266,17 @@ class TestReferenceManager:
     def test_clear(self):
         """Test clearing all references."""
         manager = ReferenceManager()
-        manager.add(self.create_ref("ref_1"))
-        manager.add(self.create_ref("ref_2"))
+        manager.add(_make_ref(ref_id="ref_1"))
+        manager.add(_make_ref(ref_id="ref_2"))
         manager.clear()
         assert len(manager) == 0
 
     def test_find_by_name(self):
         """Test finding references by name."""
         manager = ReferenceManager()
-        manager.add(self.create_ref("ref_1", name="Save Button"))
-        manager.add(self.create_ref("ref_2", name="Cancel Button"))
-        manager.add(self.create_ref("ref_3", name="Submit"))
+        manager.add(_make_ref(ref_id="ref_1", name="Save Button"))
+        manager.add(_make_ref(ref_id="ref_2", name="Cancel Button"))
+        manager.add(_make_ref(ref_id="ref_3", name="Submit"))
 
         results = manager.find_by_name("button")
         assert len(results) == 2
@@ -199,40 +284,130 @@ class TestReferenceManager:
     def test_find_by_query(self):
         """Test finding references by query."""
         manager = ReferenceManager()
-        manager.add(self.create_ref("ref_1", name="Save"))
-        manager.add(self.create_ref("ref_2", name="Cancel"))
+        manager.add(_make_ref(ref_id="ref_1", name="Save"))
+        manager.add(_make_ref(ref_id="ref_2", name="Cancel"))
 
         results = manager.find_by_query("save")
         assert len(results) == 1
         assert results[0].name == "Save"
 
-    def test_ttl_expiration(self):
+    def test_ttl_expiration(self, clock):
         """Test that references expire after TTL."""
         manager = ReferenceManager(ttl=0.1)  # 100ms TTL
-        ref = self.create_ref("ref_1")
+        ref = _make_ref(ref_id="ref_1")
         manager.add(ref)
 
         # Should exist immediately
         assert manager.get("ref_1") is not None
 
-        # Wait for expiration
-        time.sleep(0.15)
+        clock.advance(0.09)
+        assert manager.get("ref_1") is not None
 
-        # Should be expired now
+        # Past the TTL boundary
+        clock.advance(0.02)
         assert manager.get("ref_1") is None
 
-    def test_gc_interval(self):
+    def test_gc_interval(self, clock):
         """Test that GC runs periodically."""
         manager = ReferenceManager(ttl=0.1)
         manager.GC_INTERVAL = 0.05  # 50ms GC interval
 
-        manager.add(self.create_ref("ref_1"))
-        manager.add(self.create_ref("ref_2"))
+        manager.add(_make_ref(ref_id="ref_1"))
+        manager.add(_make_ref(ref_id="ref_2"))
 
-        # Wait for TTL and GC
-        time.sleep(0.2)
+        clock.advance(0.2)
 
         # Trigger GC via get
         manager.get("ref_nonexistent")
 
+        assert manager._refs == {}
         assert len(manager) == 0
+
+    def test_find_by_query_uses_index(self):
+        """Test indexed lookup keeps substring, role and insertion-order semantics."""
+        manager = ReferenceManager()
+        manager.add(_make_ref(ref_id="ref_2", name="Save Button"))
+        manager.add(_make_ref(ref_id="ref_1", name="Saved Files"))
+        manager.add(
+            _make_ref(
+                ref_id="ref_3",
+                role=ElementRole.MENU_ITEM,
+                name="Open",
+                description="open a saved document",
+            )
+        )
+
+        assert [r.ref_id for r in manager.find_by_query("sav")] == ["ref_2", "ref_1", "ref_3"]
+        assert [r.ref_id for r in manager.find_by_query("ve bu")] == ["ref_2"]
+        assert [r.ref_id for r in manager.find_by_query("menu item")] == ["ref_3"]
+        assert manager.find_by_query("save open") == []
+
+    def test_find_by_query_drops_replaced_and_cleared(self):
+        """Test the index follows replaced and cleared references."""
+        manager = ReferenceManager()
+        manager.add(_make_ref(ref_id="ref_1", name="Save"))
+        manager.add(_make_ref(ref_id="ref_1", name="Cancel"))
+        assert manager.find_by_query("save") == []
+        assert [r.name for r in manager.find_by_query("cancel")] == ["Cancel"]
+        manager.clear()
+        assert manager.find_by_query("cancel") == []
+        assert manager._suffix_index == {}
+
+    def test_find_by_query_sees_refs_added_after_a_query(self):
+        """Test the sorted suffix list is rebuilt once new tokens are indexed."""
+        manager = ReferenceManager()
+        manager.add(_make_ref(ref_id="ref_1", name="Save"))
+        assert manager.find_by_query("pen") == []
+        manager.add(_make_ref(ref_id="ref_2", name="Open"))
+        assert [r.ref_id for r in manager.find_by_query("pen")] == ["ref_2"]
+
+    def test_suffix_index_built_on_first_query(self):
+        """Test add only marks the suffix index stale; the next query rebuilds it."""
+        manager = ReferenceManager()
+        manager.add(_make_ref(ref_id="ref_1", name="Save"))
+        assert manager._suffix_index is None
+        manager.find_by_query("ave")
+        assert "ave" in manager._suffix_index
+        manager.add(_make_ref(ref_id="ref_2", name="Open"))
+        assert manager._suffix_index is None
+
+    def test_long_tokens_not_indexed(self):
+        """Test references with over-long tokens are matched without indexing them."""
+        url = "https://example.com/" + "a" * 1000
+        manager = ReferenceManager()
+        manager.add(_make_ref(ref_id="ref_1", role=ElementRole.LINK, name=url))
+        manager.add(_make_ref(ref_id="ref_2", name="Example"))
+        assert [r.ref_id for r in manager.find_by_query("example")] == ["ref_1", "ref_2"]
+        assert [r.ref_id for r in manager.find_by_query("aaa")] == ["ref_1"]
+        assert manager._unindexed == {"ref_1"}
+        assert max(map(len, manager._suffix_index)) <= references.MAX_INDEXED_TOKEN_LENGTH
+
+    def test_replaced_ref_keeps_insertion_slot(self):
+        """Test re-adding a reference keeps find_* order consistent with get_all."""
+        manager = ReferenceManager()
+        manager.add(_make_ref(ref_id="ref_1", name="Save"))
+        manager.add(_make_ref(ref_id="ref_2", name="Save As"))
+        manager.add(_make_ref(ref_id="ref_1", name="Save All"))
+        assert [r.ref_id for r in manager.get_all()] == ["ref_1", "ref_2"]
+        assert [r.ref_id for r in manager.find_by_query("save")] == ["ref_1", "ref_2"]
+        assert [r.ref_id for r in manager.find_by_role(ElementRole.BUTTON)] == ["ref_1", "ref_2"]
+
+    def test_index_drops_empty_buckets(self, clock):
+        """Test expired references leave no empty role or suffix buckets."""
+        manager = ReferenceManager(ttl=0.1)
+        manager.add(_make_ref(ref_id="ref_1", role=ElementRole.LINK, name="Help"))
+        assert [r.ref_id for r in manager.find_by_query("elp")] == ["ref_1"]
+        clock.advance(0.2)
+        assert manager.find_by_query("elp") == []
+        assert manager._role_index == {}
+        assert manager._suffix_index == {}
+        assert manager._order == {}
+
+    def test_find_by_role(self):
+        """Test role lookup returns matches in insertion order."""
+        manager = ReferenceManager()
+        manager.add(_make_ref(ref_id="ref_2", name="Save"))
+        manager.add(_make_ref(ref_id="ref_3", role=ElementRole.LINK, name="Help"))
+        manager.add(_make_ref(ref_id="ref_1", name="Cancel"))
+        assert [r.ref_id for r in manager.find_by_role(ElementRole.BUTTON)] == ["ref_2", "ref_1"]
+        assert manager.find_by_role(ElementRole.CHECK_BOX) == []
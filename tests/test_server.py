@@ -3,16 +3,24 @@
 MCP module mocks are loaded via conftest.py.
 """
 
-from unittest.mock import AsyncMock, MagicMock
+import asyncio
+import contextlib
+import dataclasses
+import sys
+import types
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
+from linux_desktop_mcp.atspi_bridge import ATSPIBridge
+from linux_desktop_mcp.exceptions import InputValidationError
 from linux_desktop_mcp.handlers import (
     MAX_COORDINATE,
     MAX_QUERY_LENGTH,
     MAX_TEXT_LENGTH,
     MIN_COORDINATE,
     ServerContext,
+    capabilities_template,
     handle_capabilities,
     handle_click,
     handle_context,
@@ -23,6 +31,7 @@ from linux_desktop_mcp.handlers import (
     handle_snapshot,
     handle_target_window,
     handle_type,
+    mcp_handler,
 )
 from linux_desktop_mcp.references import (
     ElementBounds,
@@ -30,27 +39,15 @@ from linux_desktop_mcp.references import (
     ElementRole,
     ElementState,
 )
+from linux_desktop_mcp.server import LinuxDesktopMCPServer, main
+from linux_desktop_mcp.tool_definitions import get_tool_definitions
+from linux_desktop_mcp.window_manager import WindowGeometry
 
 # ---------------------------------------------------------------------------
-# Original validation / constant tests (kept for backwards compat)
+# Validation constants and helpers
 # ---------------------------------------------------------------------------
 
 
-class TestInputValidationFunctions:
-    def test_coordinate_validation_logic(self):
-        assert 0 >= MIN_COORDINATE and 0 <= MAX_COORDINATE
-        assert 100 >= MIN_COORDINATE and 100 <= MAX_COORDINATE
-        assert MAX_COORDINATE >= MIN_COORDINATE and MAX_COORDINATE <= MAX_COORDINATE
-        assert -1 < MIN_COORDINATE
-        assert MAX_COORDINATE + 1 > MAX_COORDINATE
-
-    def test_string_validation_logic(self):
-        assert len("hello") <= MAX_TEXT_LENGTH
-        assert len("a" * MAX_TEXT_LENGTH) <= MAX_TEXT_LENGTH
-        assert len("a" * (MAX_TEXT_LENGTH + 1)) > MAX_TEXT_LENGTH
-        assert len("a" * (MAX_QUERY_LENGTH + 1)) > MAX_QUERY_LENGTH
-
-
 class TestServerConstants:
     def test_max_text_length(self):
         assert MAX_TEXT_LENGTH == 10000
@@ -63,57 +60,78 @@ class TestServerConstants:
         assert MAX_COORDINATE == 65535
 
 
-class TestValidationHelpers:
-    """Test ServerContext validation methods."""
-
-    def setup_method(self):
-        self.ctx = ServerContext()
+# Validators are pure, so one context serves every case
+_CTX = ServerContext()
 
-    def test_validate_coordinate_valid(self):
-        assert self.ctx.validate_coordinate(0) is True
-        assert self.ctx.validate_coordinate(100) is True
-        assert self.ctx.validate_coordinate(65535) is True
 
-    def test_validate_coordinate_invalid_negative(self):
-        assert self.ctx.validate_coordinate(-1) is False
+class TestValidationHelpers:
+    """Test ServerContext validation methods."""
 
-    def test_validate_coordinate_invalid_overflow(self):
-        assert self.ctx.validate_coordinate(65536) is False
+    @pytest.mark.parametrize(
+        "value, ok",
+        [
+            pytest.param(0, True, id="zero"),
+            pytest.param(100, True, id="mid"),
+            pytest.param(65535, True, id="max"),
+            pytest.param(100.5, True, id="float"),
+            pytest.param(-1, False, id="negative"),
+            pytest.param(65536, False, id="overflow"),
+            pytest.param(-0.5, False, id="negative_float"),
+        ],
+    )
+    def test_validate_coordinate(self, value, ok):
+        assert _CTX.validate_coordinate(value) is ok
 
-    def test_validate_coordinates_valid(self):
-        is_valid, error = self.ctx.validate_coordinates(100, 200)
-        assert is_valid is True
-        assert error == ""
+    @pytest.mark.parametrize(
+        "x, y",
+        [pytest.param(100, 200, id="int"), pytest.param(100.5, 200, id="float")],
+    )
+    def test_validate_coordinates_valid(self, x, y):
+        assert _CTX.validate_coordinates(x, y) == (100, 200)
+
+    @pytest.mark.parametrize(
+        "x, y, message",
+        [
+            pytest.param(-1, 100, "X coordinate", id="invalid_x"),
+            pytest.param(100, -1, "Y coordinate", id="invalid_y"),
+            pytest.param("abc", 100, "must be numbers", id="non_numeric"),
+        ],
+    )
+    def test_validate_coordinates_invalid(self, x, y, message):
+        with pytest.raises(InputValidationError, match=message):
+            _CTX.validate_coordinates(x, y)
 
-    def test_validate_coordinates_invalid_x(self):
-        is_valid, error = self.ctx.validate_coordinates(-1, 100)
-        assert is_valid is False
-        assert "X coordinate" in error
+    def test_validate_string_valid(self):
+        assert _CTX.validate_string("hello", 100, "test") is None
+
+    @pytest.mark.parametrize(
+        "value, message",
+        [
+            pytest.param("a" * 101, "too long", id="too_long"),
+            pytest.param(123, "must be a string", id="non_string"),
+        ],
+    )
+    def test_validate_string_invalid(self, value, message):
+        with pytest.raises(InputValidationError, match=message):
+            _CTX.validate_string(value, 100, "test")
 
-    def test_validate_coordinates_invalid_y(self):
-        is_valid, error = self.ctx.validate_coordinates(100, -1)
-        assert is_valid is False
-        assert "Y coordinate" in error
 
-    def test_validate_coordinates_non_numeric(self):
-        is_valid, error = self.ctx.validate_coordinates("abc", 100)
-        assert is_valid is False
-        assert "must be numbers" in error
+class TestMcpHandler:
+    async def test_validation_error_becomes_response(self):
+        @mcp_handler
+        async def handler(ctx, args):
+            raise InputValidationError("bad input")
 
-    def test_validate_string_valid(self):
-        is_valid, error = self.ctx.validate_string("hello", 100, "test")
-        assert is_valid is True
-        assert error == ""
+        result = await handler(ServerContext(), {})
+        assert _text(result) == "Error: bad input"
 
-    def test_validate_string_too_long(self):
-        is_valid, error = self.ctx.validate_string("a" * 101, 100, "test")
-        assert is_valid is False
-        assert "too long" in error
+    async def test_passes_through_result(self):
+        @mcp_handler
+        async def handler(ctx, args):
+            return ["ok"]
 
-    def test_validate_string_non_string(self):
-        is_valid, error = self.ctx.validate_string(123, 100, "test")
-        assert is_valid is False
-        assert "must be a string" in error
+        assert await handler(ServerContext(), {}) == ["ok"]
+        assert handler.__name__ == "handler"
 
 
 # ---------------------------------------------------------------------------
@@ -121,6 +139,25 @@ class TestValidationHelpers:
 # ---------------------------------------------------------------------------
 
 
+# Over-limit inputs, built once at import
+_LONG_TEXT = "x" * (MAX_TEXT_LENGTH + 1)
+_LONG_QUERY = "x" * (MAX_QUERY_LENGTH + 1)
+_LONG_KEY = "x" * 51
+
+# Placeholder accessible shared by every test; handlers only check it is set
+_ATSPI = MagicMock()
+
+# Shared by every _make_ref reference; handlers only read them
+_DEFAULT_BOUNDS = ElementBounds(x=100, y=100, width=50, height=30)
+_STATE_RO = ElementState(editable=False)
+_STATE_RW = ElementState(editable=True)
+
+
+def _text(result: list) -> str:
+    """Text of a handler's first content block."""
+    return result[0].text
+
+
 def _make_ref(
     ref_id="ref_1",
     name="Test Button",
@@ -134,293 +171,462 @@ def _make_ref(
         source="atspi",
         role=role,
         name=name,
-        bounds=ElementBounds(x=100, y=100, width=50, height=30),
-        state=ElementState(editable=editable),
+        bounds=_DEFAULT_BOUNDS,
+        state=_STATE_RW if editable else _STATE_RO,
         available_actions=actions or [],
-        atspi_accessible=accessible or MagicMock(),
+        atspi_accessible=accessible or _ATSPI,
     )
 
 
 class TestHandleSnapshot:
-    @pytest.mark.asyncio
     async def test_no_bridge(self, server_ctx):
         server_ctx.bridge = None
         result = await handle_snapshot(server_ctx, {})
-        assert "AT-SPI2 not available" in result[0].text
+        assert "AT-SPI2 not available" in _text(result)
 
-    @pytest.mark.asyncio
     async def test_empty_tree(self, server_ctx):
-        server_ctx.bridge.build_tree = AsyncMock(return_value=[])
+        server_ctx.bridge.build_tree.return_value = []
         result = await handle_snapshot(server_ctx, {})
-        assert "No elements found" in result[0].text
+        assert "No elements found" in _text(result)
 
-    @pytest.mark.asyncio
     async def test_with_elements(self, server_ctx):
         ref = _make_ref()
-        server_ctx.bridge.build_tree = AsyncMock(return_value=[ref])
+        server_ctx.bridge.build_tree.return_value = [ref]
         server_ctx.bridge.ref_manager.add(ref)
         result = await handle_snapshot(server_ctx, {})
-        assert "ref_1" in result[0].text
+        assert "ref_1" in _text(result)
+
+    async def test_nested_tree_order(self, server_ctx):
+        root = _make_ref(ref_id="ref_1", name="Root")
+        first = _make_ref(ref_id="ref_2", name="First")
+        second = _make_ref(ref_id="ref_3", name="Second")
+        first.parent_ref = second.parent_ref = "ref_1"
+        root.child_refs = ["ref_2", "ref_3"]
+        for ref in (root, first, second):
+            server_ctx.bridge.ref_manager.add(ref)
+        server_ctx.bridge.build_tree.return_value = [root, first, second]
+        result = await handle_snapshot(server_ctx, {})
+        lines = _text(result).splitlines()
+        assert lines.index('- ref_1: [button] "Root"') < lines.index('  - ref_2: [button] "First"')
+        assert lines.index('  - ref_2: [button] "First"') < lines.index(
+            '  - ref_3: [button] "Second"'
+        )
+
+    async def test_redundant_label_pruned(self, server_ctx):
+        button = _make_ref(ref_id="ref_1", name="Save")
+        label = _make_ref(ref_id="ref_2", name=" Save", role=ElementRole.LABEL)
+        icon = _make_ref(ref_id="ref_3", name="", role=ElementRole.ICON)
+        label.parent_ref, icon.parent_ref = "ref_1", "ref_2"
+        button.child_refs, label.child_refs = ["ref_2"], ["ref_3"]
+        server_ctx.bridge.build_tree.return_value = [button, label, icon]
+        result = await handle_snapshot(server_ctx, {})
+        text = _text(result)
+        assert "ref_2" not in text
+        assert "  - ref_3: [icon]" in text
+        assert "Total elements: 2" in text
+
+    async def test_large_tree_chunked(self, server_ctx, monkeypatch):
+        monkeypatch.setattr("linux_desktop_mcp.handlers.SNAPSHOT_CHUNK_LINES", 2)
+        refs = [_make_ref(ref_id=f"ref_{i}", name=f"Item {i}") for i in range(1, 6)]
+        server_ctx.bridge.build_tree.return_value = refs
+        result = await handle_snapshot(server_ctx, {})
+        assert len(result) == 3
+        assert _text(result).startswith("# Desktop Accessibility Tree")
+        assert "Total elements: 5" in result[-1].text
+        assert all(f"ref_{i}:" in "".join(r.text for r in result) for i in range(1, 6))
 
-    @pytest.mark.asyncio
     async def test_app_filter(self, server_ctx):
         ref = _make_ref()
-        server_ctx.bridge.build_tree = AsyncMock(return_value=[ref])
+        server_ctx.bridge.build_tree.return_value = [ref]
         server_ctx.bridge.ref_manager.add(ref)
         result = await handle_snapshot(server_ctx, {"app_name": "Firefox"})
-        assert "Filtered by app: Firefox" in result[0].text
+        text = _text(result)
+        assert "Filtered by app: Firefox" in text
+        assert "ref_1" in text
+
+    async def test_app_filter_from_cached_tree(self, server_ctx):
+        ref = _make_ref()
+        server_ctx.bridge.refs_for_app.return_value = [ref]
+        result = await handle_snapshot(server_ctx, {"app_name": "Firefox"})
+        assert "ref_1" in _text(result)
+        server_ctx.bridge.refs_for_app.assert_called_once_with("Firefox", 15)
+        server_ctx.bridge.build_tree.assert_not_awaited()
+
+    async def test_refresh_bypasses_app_slice(self, server_ctx):
+        with patch("linux_desktop_mcp.atspi_bridge.ATSPI_AVAILABLE", True):
+            bridge = ATSPIBridge(max_workers=1)
+        firefox, gedit = _make_ref(ref_id="ref_1", name="Tab"), _make_ref(ref_id="ref_2")
+        firefox.app_name, gedit.app_name = "Firefox", "gedit"
+        bridge._get_applications_sync = MagicMock(return_value=[MagicMock()])
+        bridge._build_app_tree_sync = MagicMock(return_value=[firefox, gedit])
+        server_ctx.bridge = bridge
+        try:
+            await handle_snapshot(server_ctx, {})
+            await handle_snapshot(server_ctx, {"app_name": "firefox"})
+            assert bridge._build_app_tree_sync.call_count == 1
+
+            result = await handle_snapshot(server_ctx, {"app_name": "firefox", "refresh": True})
+            assert bridge._build_app_tree_sync.call_count == 2
+            assert "ref_1" in _text(result)
+        finally:
+            bridge._executor.shutdown(wait=False)
+
+    async def test_refresh_invalidates_tree_cache(self, server_ctx):
+        server_ctx.bridge.build_tree.return_value = [_make_ref()]
+        await handle_snapshot(server_ctx, {"app_name": "Firefox", "refresh": True})
+        server_ctx.bridge.invalidate_tree_cache.assert_called_once_with()
+        server_ctx.bridge.build_tree.assert_awaited_once()
 
 
 class TestHandleFind:
-    @pytest.mark.asyncio
     async def test_no_bridge(self, server_ctx):
         server_ctx.bridge = None
         result = await handle_find(server_ctx, {"query": "button"})
-        assert "AT-SPI2 not available" in result[0].text
+        assert "AT-SPI2 not available" in _text(result)
 
-    @pytest.mark.asyncio
     async def test_empty_query(self, server_ctx):
         result = await handle_find(server_ctx, {"query": ""})
-        assert "empty" in result[0].text.lower()
+        assert "empty" in _text(result).lower()
 
-    @pytest.mark.asyncio
     async def test_query_too_long(self, server_ctx):
-        result = await handle_find(server_ctx, {"query": "x" * 1001})
-        assert "too long" in result[0].text.lower()
+        result = await handle_find(server_ctx, {"query": _LONG_QUERY})
+        assert "too long" in _text(result).lower()
 
-    @pytest.mark.asyncio
     async def test_no_matches(self, server_ctx):
-        server_ctx.bridge.build_tree = AsyncMock(return_value=[])
+        server_ctx.bridge.build_tree.return_value = []
         result = await handle_find(server_ctx, {"query": "nonexistent"})
-        assert "No elements found" in result[0].text
+        assert "No elements found" in _text(result)
 
-    @pytest.mark.asyncio
     async def test_with_matches(self, server_ctx):
         ref = _make_ref(name="Save Button")
-        server_ctx.bridge.build_tree = AsyncMock(return_value=[ref])
+        server_ctx.bridge.build_tree.return_value = [ref]
         server_ctx.bridge.ref_manager.add(ref)
         result = await handle_find(server_ctx, {"query": "Save"})
-        assert "Save Button" in result[0].text
+        assert "Save Button" in _text(result)
+
+    async def test_refresh_invalidates_tree_cache(self, server_ctx):
+        server_ctx.bridge.build_tree.return_value = []
+        await handle_find(server_ctx, {"query": "Save"})
+        server_ctx.bridge.invalidate_tree_cache.assert_not_called()
+        await handle_find(server_ctx, {"query": "Save", "refresh": True})
+        server_ctx.bridge.invalidate_tree_cache.assert_called_once_with()
 
 
 class TestHandleClick:
-    @pytest.mark.asyncio
     async def test_no_bridge(self, server_ctx):
         server_ctx.bridge = None
         result = await handle_click(server_ctx, {"ref": "ref_1"})
-        assert "AT-SPI2 not available" in result[0].text
+        assert "AT-SPI2 not available" in _text(result)
 
-    @pytest.mark.asyncio
     async def test_ref_not_found(self, server_ctx):
         result = await handle_click(server_ctx, {"ref": "ref_999"})
-        assert "not found or expired" in result[0].text
+        assert "not found or expired" in _text(result)
 
-    @pytest.mark.asyncio
     async def test_click_by_ref_atspi_action(self, server_ctx):
         ref = _make_ref(actions=["click"])
         server_ctx.bridge.ref_manager.add(ref)
-        server_ctx.bridge.click_element = AsyncMock(return_value=True)
+        server_ctx.bridge.click_element.return_value = True
         result = await handle_click(server_ctx, {"ref": "ref_1", "element": "button"})
-        assert "via AT-SPI action" in result[0].text
+        assert "via AT-SPI action" in _text(result)
 
-    @pytest.mark.asyncio
     async def test_click_by_coordinate(self, server_ctx):
-        server_ctx.input.click = AsyncMock(return_value=True)
+        server_ctx.input.click.return_value = True
         result = await handle_click(server_ctx, {"coordinate": [100, 200]})
-        assert "Clicked at (100, 200)" in result[0].text
+        assert "Clicked at (100, 200)" in _text(result)
+        server_ctx.bridge.invalidate_tree_cache.assert_called_once()
 
-    @pytest.mark.asyncio
     async def test_click_invalid_coordinate(self, server_ctx):
         result = await handle_click(server_ctx, {"coordinate": [-1, 200]})
-        assert "Error" in result[0].text
+        assert "Error" in _text(result)
 
-    @pytest.mark.asyncio
     async def test_click_no_ref_no_coord(self, server_ctx):
         result = await handle_click(server_ctx, {})
-        assert "Provide either ref or coordinate" in result[0].text
+        assert "Provide either ref or coordinate" in _text(result)
 
-    @pytest.mark.asyncio
     async def test_click_coordinate_wrong_length(self, server_ctx):
         result = await handle_click(server_ctx, {"coordinate": [100]})
-        assert "must be [x, y]" in result[0].text
+        assert "must be [x, y]" in _text(result)
 
-    @pytest.mark.asyncio
     async def test_click_by_ref_fallback_to_input(self, server_ctx):
         ref = _make_ref(actions=[])
         server_ctx.bridge.ref_manager.add(ref)
-        server_ctx.input.click_element = AsyncMock(return_value=True)
+        server_ctx.input.click_element.return_value = True
         result = await handle_click(server_ctx, {"ref": "ref_1"})
-        assert "Clicked" in result[0].text
+        assert "Clicked" in _text(result)
 
 
 class TestHandleType:
-    @pytest.mark.asyncio
     async def test_no_input(self, server_ctx):
         server_ctx.input = None
         result = await handle_type(server_ctx, {"text": "hello"})
-        assert "No keyboard input" in result[0].text
+        assert "No keyboard input" in _text(result)
 
-    @pytest.mark.asyncio
     async def test_success(self, server_ctx):
-        server_ctx.input.type_text = AsyncMock(return_value=True)
+        server_ctx.input.type_text.return_value = True
         result = await handle_type(server_ctx, {"text": "hello"})
-        assert "Typed text" in result[0].text
+        assert "Typed text" in _text(result)
 
-    @pytest.mark.asyncio
     async def test_with_ref(self, server_ctx):
         ref = _make_ref(editable=True)
         server_ctx.bridge.ref_manager.add(ref)
-        server_ctx.bridge.set_text = AsyncMock(return_value=True)
+        server_ctx.bridge.set_text.return_value = True
         result = await handle_type(server_ctx, {"text": "hello", "ref": "ref_1"})
-        assert "via AT-SPI" in result[0].text
+        assert "via AT-SPI" in _text(result)
 
-    @pytest.mark.asyncio
     async def test_text_too_long(self, server_ctx):
-        result = await handle_type(server_ctx, {"text": "x" * 10001})
-        assert "too long" in result[0].text.lower()
+        result = await handle_type(server_ctx, {"text": _LONG_TEXT})
+        assert "too long" in _text(result).lower()
 
-    @pytest.mark.asyncio
     async def test_submit(self, server_ctx):
-        server_ctx.input.type_text = AsyncMock(return_value=True)
-        server_ctx.input.key = AsyncMock(return_value=True)
+        server_ctx.input.type_text.return_value = True
+        server_ctx.input.key.return_value = True
         result = await handle_type(server_ctx, {"text": "hello", "submit": True})
-        assert "pressed Enter" in result[0].text
+        assert "pressed Enter" in _text(result)
 
-    @pytest.mark.asyncio
     async def test_clear_first(self, server_ctx):
-        server_ctx.input.type_text = AsyncMock(return_value=True)
-        server_ctx.input.key = AsyncMock(return_value=True)
+        server_ctx.input.type_text.return_value = True
+        server_ctx.input.clear_field.return_value = True
         result = await handle_type(server_ctx, {"text": "hello", "clear_first": True})
-        assert "Typed text" in result[0].text
+        assert "Typed text" in _text(result)
+        server_ctx.input.clear_field.assert_awaited_once()
 
-    @pytest.mark.asyncio
     async def test_ref_not_found(self, server_ctx):
         result = await handle_type(server_ctx, {"text": "hello", "ref": "ref_999"})
-        assert "not found or expired" in result[0].text
+        assert "not found or expired" in _text(result)
 
 
 class TestHandleKey:
-    @pytest.mark.asyncio
     async def test_no_input(self, server_ctx):
         server_ctx.input = None
         result = await handle_key(server_ctx, {"key": "Return"})
-        assert "No keyboard input" in result[0].text
+        assert "No keyboard input" in _text(result)
 
-    @pytest.mark.asyncio
     async def test_success(self, server_ctx):
-        server_ctx.input.key = AsyncMock(return_value=True)
+        server_ctx.input.key.return_value = True
         result = await handle_key(server_ctx, {"key": "Return"})
-        assert "Pressed Return" in result[0].text
+        assert "Pressed Return" in _text(result)
 
-    @pytest.mark.asyncio
     async def test_with_modifiers(self, server_ctx):
-        server_ctx.input.key = AsyncMock(return_value=True)
+        server_ctx.input.key.return_value = True
         result = await handle_key(server_ctx, {"key": "c", "modifiers": ["ctrl"]})
-        assert "ctrl+c" in result[0].text
+        assert "ctrl+c" in _text(result)
 
-    @pytest.mark.asyncio
     async def test_empty_key(self, server_ctx):
         result = await handle_key(server_ctx, {"key": ""})
-        assert "required" in result[0].text.lower()
+        assert "required" in _text(result).lower()
 
-    @pytest.mark.asyncio
     async def test_key_too_long(self, server_ctx):
-        result = await handle_key(server_ctx, {"key": "x" * 51})
-        assert "too long" in result[0].text.lower()
+        result = await handle_key(server_ctx, {"key": _LONG_KEY})
+        assert "too long" in _text(result).lower()
 
-    @pytest.mark.asyncio
     async def test_key_failure(self, server_ctx):
-        server_ctx.input.key = AsyncMock(return_value=False)
+        server_ctx.input.key.return_value = False
         result = await handle_key(server_ctx, {"key": "Return"})
-        assert "Failed" in result[0].text
+        assert "Failed" in _text(result)
 
 
 class TestHandleCapabilities:
-    @pytest.mark.asyncio
     async def test_returns_info(self, server_ctx):
         result = await handle_capabilities(server_ctx, {})
-        text = result[0].text
+        text = _text(result)
         assert "Display Server" in text
         assert "AT-SPI2 Available" in text
         assert "Input Tools" in text
 
+    async def test_static_template_cached(self, server_ctx):
+        server_ctx.capabilities = dataclasses.replace(
+            server_ctx.capabilities, compositor_name="sway {beta}"
+        )
+        first = await handle_capabilities(server_ctx, {})
+        template = capabilities_template(server_ctx.capabilities)
+        server_ctx.input.backend_name = "other"
+        second = await handle_capabilities(server_ctx, {})
+        assert capabilities_template(server_ctx.capabilities) is template
+        assert "Compositor: sway {beta}" in _text(first)
+        assert "Active Input Backend: other" in _text(second)
+
 
 class TestHandleContext:
-    @pytest.mark.asyncio
     async def test_no_group(self, server_ctx):
         result = await handle_context(server_ctx, {})
-        assert "No active window group" in result[0].text
+        assert "No active window group" in _text(result)
 
-    @pytest.mark.asyncio
     async def test_with_group(self, server_ctx):
         server_ctx.window_manager.add_window_to_active_group(
-            app_name="App", window_title="Win", atspi_accessible=MagicMock()
+            app_name="App", window_title="Win", atspi_accessible=_ATSPI
+        )
+        result = await handle_context(server_ctx, {})
+        text = _text(result)
+        assert "Active Window Group" in text
+        assert "Win" in text
+
+    async def test_reports_window_closed_since_last_check(self, server_ctx):
+        acc = MagicMock()
+        group, _ = server_ctx.window_manager.add_window_to_active_group(
+            app_name="App", window_title="Win", atspi_accessible=acc
         )
+        group.validate_windows()
+        acc.get_state_set.side_effect = Exception("closed")
         result = await handle_context(server_ctx, {})
-        assert "Active Window Group" in result[0].text
-        assert "Win" in result[0].text
+        assert "(Removed 1 closed windows)" in _text(result)
 
-    @pytest.mark.asyncio
     async def test_list_available_no_discovery(self, server_ctx):
         result = await handle_context(server_ctx, {"list_available": True})
-        assert "Window discovery not available" in result[0].text
+        assert "Window discovery not available" in _text(result)
 
 
 class TestHandleTargetWindow:
-    @pytest.mark.asyncio
     async def test_no_discovery(self, server_ctx):
         result = await handle_target_window(server_ctx, {"window_title": "Test"})
-        assert "Window discovery not available" in result[0].text
+        assert "Window discovery not available" in _text(result)
 
-    @pytest.mark.asyncio
     async def test_no_title_no_app(self, server_ctx):
         server_ctx.window_discovery = MagicMock()
         result = await handle_target_window(server_ctx, {})
-        assert "Provide either" in result[0].text
+        assert "Provide either" in _text(result)
 
-    @pytest.mark.asyncio
     async def test_window_id_not_found(self, server_ctx):
         server_ctx.window_discovery = MagicMock()
         result = await handle_target_window(server_ctx, {"window_id": "win_99"})
-        assert "not found" in result[0].text
+        assert "not found" in _text(result)
+
+    async def test_target_by_title(self, server_ctx):
+        win = MagicMock(app_name="gedit", window_title="notes.txt")
+        win.geometry = WindowGeometry(x=10, y=20, width=800, height=600)
+        server_ctx.window_discovery = MagicMock()
+        server_ctx.window_discovery.find_window_by_title = AsyncMock(return_value=[win, win])
+        result = await handle_target_window(server_ctx, {"window_title": "notes"})
+        group_id = server_ctx.window_manager.get_active_group().group_id
+        assert _text(result) == (
+            "# Window Targeted\n\n- Window ID: win_1\n"
+            '- Title: "notes.txt"\n- Application: gedit\n'
+            f"- Group: {group_id}\n- Color: blue\n"
+            "- Position: (10, 20)\n- Size: 800x600\n\n"
+            "Note: 2 windows matched. Targeted first match."
+        )
 
 
 class TestHandleCreateWindowGroup:
-    @pytest.mark.asyncio
     async def test_create(self, server_ctx):
         result = await handle_create_window_group(server_ctx, {"name": "MyGroup"})
-        assert "Window Group Created" in result[0].text
-        assert "MyGroup" in result[0].text
+        text = _text(result)
+        assert "Window Group Created" in text
+        assert "MyGroup" in text
 
-    @pytest.mark.asyncio
     async def test_create_with_color(self, server_ctx):
         result = await handle_create_window_group(server_ctx, {"name": "Red", "color": "red"})
-        assert "red" in result[0].text
+        assert "red" in _text(result)
 
 
 class TestHandleReleaseWindow:
-    @pytest.mark.asyncio
     async def test_release_all(self, server_ctx):
         server_ctx.window_manager.add_window_to_active_group(
-            app_name="App", window_title="Win", atspi_accessible=MagicMock()
+            app_name="App", window_title="Win", atspi_accessible=_ATSPI
         )
         result = await handle_release_window(server_ctx, {"release_all": True})
-        assert "Released 1 windows" in result[0].text
+        assert "Released 1 windows" in _text(result)
 
-    @pytest.mark.asyncio
     async def test_release_specific(self, server_ctx):
         _, target = server_ctx.window_manager.add_window_to_active_group(
-            app_name="App", window_title="Win", atspi_accessible=MagicMock()
+            app_name="App", window_title="Win", atspi_accessible=_ATSPI
         )
         result = await handle_release_window(server_ctx, {"window_id": target.window_id})
-        assert "Released window" in result[0].text
+        assert "Released window" in _text(result)
 
-    @pytest.mark.asyncio
     async def test_release_not_found(self, server_ctx):
         result = await handle_release_window(server_ctx, {"window_id": "win_99"})
-        assert "not found" in result[0].text
+        assert "not found" in _text(result)
 
-    @pytest.mark.asyncio
     async def test_release_no_args(self, server_ctx):
         result = await handle_release_window(server_ctx, {})
-        assert "Provide window_id" in result[0].text
+        assert "Provide window_id" in _text(result)
+
+
+class TestToolDefinitions:
+    def test_built_once(self):
+        assert get_tool_definitions() is get_tool_definitions()
+
+
+class TestServerInitialization:
+    async def test_initialized_once(self, monkeypatch):
+        monkeypatch.setattr("linux_desktop_mcp.server.ATSPI_AVAILABLE", False)
+        monkeypatch.setattr("linux_desktop_mcp.server.WINDOW_DISCOVERY_AVAILABLE", False)
+        server = LinuxDesktopMCPServer()
+        server._ensure_initialized = AsyncMock(return_value=True)
+        await asyncio.gather(server._initialize_once(), server._initialize_once())
+        await server._initialize_once()
+        server._ensure_initialized.assert_awaited_once()
+        assert server._initialized is True
+
+    async def test_subsystem_failure_logged(self, caps_x11, monkeypatch, caplog):
+        monkeypatch.setattr("linux_desktop_mcp.server.ATSPI_AVAILABLE", True)
+        monkeypatch.setattr("linux_desktop_mcp.server.WINDOW_DISCOVERY_AVAILABLE", True)
+        monkeypatch.setattr("linux_desktop_mcp.server.detect_capabilities", lambda: caps_x11)
+        monkeypatch.setattr(
+            "linux_desktop_mcp.server.ATSPIBridge", MagicMock(side_effect=RuntimeError("no bus"))
+        )
+        discovery = MagicMock()
+        monkeypatch.setattr("linux_desktop_mcp.server.WindowDiscovery", lambda: discovery)
+        monkeypatch.setattr("linux_desktop_mcp.server.OverlayManager", MagicMock())
+
+        server = LinuxDesktopMCPServer()
+        assert await server._ensure_initialized() is False
+        assert server._ctx.capabilities is caps_x11
+        assert server._ctx.bridge is None
+        assert server._ctx.window_discovery is discovery
+        assert server._ctx.overlay_manager is not None
+        assert "Failed to initialize AT-SPI bridge: no bus" in caplog.text
+
+    async def test_failed_subsystem_retried(self, caps_x11, monkeypatch):
+        monkeypatch.setattr("linux_desktop_mcp.server.ATSPI_AVAILABLE", True)
+        monkeypatch.setattr("linux_desktop_mcp.server.WINDOW_DISCOVERY_AVAILABLE", True)
+        monkeypatch.setattr("linux_desktop_mcp.server.detect_capabilities", lambda: caps_x11)
+        bridge = MagicMock()
+        bridge_factory = MagicMock(side_effect=[RuntimeError("registry not up"), bridge])
+        monkeypatch.setattr("linux_desktop_mcp.server.ATSPIBridge", bridge_factory)
+        monkeypatch.setattr("linux_desktop_mcp.server.WindowDiscovery", MagicMock())
+        monkeypatch.setattr("linux_desktop_mcp.server.OverlayManager", MagicMock())
+
+        server = LinuxDesktopMCPServer()
+        await server._initialize_once()
+        assert server._ctx.bridge is None
+        assert server._initialized is False
+
+        await server._initialize_once()
+        assert server._ctx.bridge is bridge
+        assert server._initialized is True
+
+        await server._initialize_once()
+        assert bridge_factory.call_count == 2
+
+
+class TestMain:
+    def test_prefers_uvloop(self, monkeypatch):
+        uvloop = types.SimpleNamespace(run=MagicMock(side_effect=lambda coro: coro.close()))
+        monkeypatch.setitem(sys.modules, "uvloop", uvloop)
+        monkeypatch.setattr("linux_desktop_mcp.server.asyncio.run", MagicMock())
+        main()
+        uvloop.run.assert_called_once()
+        asyncio.run.assert_not_called()
+
+    def test_falls_back_to_asyncio(self, monkeypatch):
+        monkeypatch.setitem(sys.modules, "uvloop", None)
+        run = MagicMock(side_effect=lambda coro: coro.close())
+        monkeypatch.setattr("linux_desktop_mcp.server.asyncio.run", run)
+        main()
+        run.assert_called_once()
+
+
+class TestServerRun:
+    async def test_reuses_initialization_options(self, monkeypatch):
+        @contextlib.asynccontextmanager
+        async def fake_stdio():
+            yield "read", "write"
+
+        monkeypatch.setattr("linux_desktop_mcp.server.stdio_server", fake_stdio)
+        server = LinuxDesktopMCPServer()
+        server._server.run = AsyncMock()
+        await server.run()
+        await server.run()
+        server._server.run.assert_awaited_with("read", "write", server._init_options)
+        assert server._server.handlers.keys() == {"list_tools", "call_tool"}
@@ -3,8 +3,12 @@
 Pure Python tests — no mocks needed for most (dataclasses + enums).
 """
 
+from types import SimpleNamespace
 from unittest.mock import MagicMock
 
+import pytest
+
+from linux_desktop_mcp import window_manager
 from linux_desktop_mcp.window_manager import (
     GroupColor,
     WindowGeometry,
@@ -13,27 +17,58 @@ from linux_desktop_mcp.window_manager import (
     WindowTarget,
 )
 
+# Shared read-only geometry for to_dict checks
+GEOM_SAMPLE = WindowGeometry(x=10, y=20, width=300, height=400)
+
+# Inert accessible for targets whose validity check only needs to succeed
+_ACCESSIBLE = SimpleNamespace(get_state_set=lambda: None)
+
+
+class _ClosedAccessible:
+    """Accessible whose window has gone away."""
+
+    def get_state_set(self):
+        raise Exception("closed")
+
+
+_CLOSED = _ClosedAccessible()
+
+
+@pytest.fixture
+def clock(monkeypatch) -> SimpleNamespace:
+    """Drive validation TTLs from a manually advanced monotonic clock."""
+    fake = SimpleNamespace(now=1000.0)
+    fake.monotonic = lambda: fake.now
+    fake.advance = lambda seconds: setattr(fake, "now", fake.now + seconds)
+    monkeypatch.setattr(window_manager, "time", fake)
+    return fake
+
+
+def _make_target(window_id: str = "win_1", **kwargs) -> WindowTarget:
+    """Create a test window target around the shared inert accessible."""
+    defaults = {
+        "app_name": "App",
+        "window_title": "Title",
+        "atspi_accessible": _ACCESSIBLE,
+    }
+    defaults.update(kwargs)
+    return WindowTarget(window_id=window_id, **defaults)
+
+
 # ---------------------------------------------------------------------------
 # GroupColor
 # ---------------------------------------------------------------------------
 
 
 class TestGroupColor:
-    def test_from_string_known_colors(self):
-        assert GroupColor.from_string("blue") is GroupColor.BLUE
-        assert GroupColor.from_string("purple") is GroupColor.PURPLE
-        assert GroupColor.from_string("green") is GroupColor.GREEN
-        assert GroupColor.from_string("orange") is GroupColor.ORANGE
-        assert GroupColor.from_string("red") is GroupColor.RED
-        assert GroupColor.from_string("cyan") is GroupColor.CYAN
-
-    def test_from_string_case_insensitive(self):
-        assert GroupColor.from_string("BLUE") is GroupColor.BLUE
-        assert GroupColor.from_string("Blue") is GroupColor.BLUE
-
-    def test_from_string_unknown_defaults_to_blue(self):
-        assert GroupColor.from_string("magenta") is GroupColor.BLUE
-        assert GroupColor.from_string("") is GroupColor.BLUE
+    @pytest.mark.parametrize("casing", ["lower", "upper", "title"])
+    @pytest.mark.parametrize("color", list(GroupColor), ids=lambda c: c.name)
+    def test_from_string(self, color, casing):
+        assert GroupColor.from_string(getattr(color.name, casing)()) is color
+
+    @pytest.mark.parametrize("text", ["magenta", ""], ids=["unknown", "empty"])
+    def test_from_string_defaults_to_blue(self, text):
+        assert GroupColor.from_string(text) is GroupColor.BLUE
 
     def test_to_rgb_returns_floats(self):
         r, g, b = GroupColor.BLUE.to_rgb()
@@ -47,10 +82,10 @@ class TestGroupColor:
         assert g < 0.3
         assert b < 0.3
 
-    def test_hex_format(self):
-        for color in GroupColor:
-            assert color.value.startswith("#")
-            assert len(color.value) == 7
+    @pytest.mark.parametrize("color", list(GroupColor), ids=lambda c: c.name)
+    def test_hex_format(self, color):
+        assert color.value.startswith("#")
+        assert len(color.value) == 7
 
 
 # ---------------------------------------------------------------------------
@@ -59,30 +94,25 @@ class TestGroupColor:
 
 
 class TestWindowGeometry:
-    def test_is_valid_normal(self):
-        g = WindowGeometry(x=0, y=0, width=800, height=600)
-        assert g.is_valid is True
-
-    def test_is_valid_zero_width(self):
-        g = WindowGeometry(x=0, y=0, width=0, height=600)
-        assert g.is_valid is False
-
-    def test_is_valid_zero_height(self):
-        g = WindowGeometry(x=0, y=0, width=800, height=0)
-        assert g.is_valid is False
-
-    def test_is_valid_negative_dimensions(self):
-        g = WindowGeometry(x=0, y=0, width=-1, height=600)
-        assert g.is_valid is False
+    @pytest.mark.parametrize(
+        "width, height, expected",
+        [
+            pytest.param(800, 600, True, id="normal"),
+            pytest.param(0, 600, False, id="zero_width"),
+            pytest.param(800, 0, False, id="zero_height"),
+            pytest.param(-1, 600, False, id="negative_width"),
+            pytest.param(800, -5, False, id="negative_height"),
+        ],
+    )
+    def test_is_valid(self, width, height, expected):
+        g = WindowGeometry(x=0, y=0, width=width, height=height)
+        assert g.is_valid is expected
 
     def test_to_dict(self):
-        g = WindowGeometry(x=10, y=20, width=300, height=400)
-        d = g.to_dict()
-        assert d == {"x": 10, "y": 20, "width": 300, "height": 400}
+        assert GEOM_SAMPLE.to_dict() == {"x": 10, "y": 20, "width": 300, "height": 400}
 
     def test_to_dict_keys_are_strings(self):
-        d = WindowGeometry(x=0, y=0, width=1, height=1).to_dict()
-        assert all(isinstance(k, str) for k in d)
+        assert all(isinstance(k, str) for k in GEOM_SAMPLE.to_dict())
 
 
 # ---------------------------------------------------------------------------
@@ -91,18 +121,8 @@ class TestWindowGeometry:
 
 
 class TestWindowTarget:
-    def _make_target(self, **kwargs) -> WindowTarget:
-        defaults = {
-            "window_id": "win_1",
-            "app_name": "Firefox",
-            "window_title": "GitHub",
-            "atspi_accessible": MagicMock(),
-        }
-        defaults.update(kwargs)
-        return WindowTarget(**defaults)
-
     def test_to_dict_contains_keys(self):
-        t = self._make_target()
+        t = _make_target()
         d = t.to_dict()
         assert "window_id" in d
         assert "app_name" in d
@@ -110,31 +130,26 @@ class TestWindowTarget:
         assert "is_active" in d
 
     def test_to_dict_geometry_none(self):
-        t = self._make_target(geometry=None)
+        t = _make_target(geometry=None)
         assert t.to_dict()["geometry"] is None
 
     def test_to_dict_geometry_present(self):
-        t = self._make_target(geometry=WindowGeometry(x=1, y=2, width=3, height=4))
+        t = _make_target(geometry=WindowGeometry(x=1, y=2, width=3, height=4))
         assert t.to_dict()["geometry"] == {"x": 1, "y": 2, "width": 3, "height": 4}
 
-    def test_is_valid_with_mock_accessible(self):
-        mock_acc = MagicMock()
-        mock_acc.get_state_set.return_value = MagicMock()
-        t = self._make_target(atspi_accessible=mock_acc)
-        assert t.is_valid() is True
-
-    def test_is_valid_none_accessible(self):
-        t = self._make_target(atspi_accessible=None)
-        assert t.is_valid() is False
-
-    def test_is_valid_exception_means_invalid(self):
-        mock_acc = MagicMock()
-        mock_acc.get_state_set.side_effect = Exception("closed")
-        t = self._make_target(atspi_accessible=mock_acc)
-        assert t.is_valid() is False
+    @pytest.mark.parametrize(
+        "accessible, expected",
+        [
+            pytest.param(_ACCESSIBLE, True, id="live"),
+            pytest.param(None, False, id="none"),
+            pytest.param(_CLOSED, False, id="raises"),
+        ],
+    )
+    def test_is_valid(self, accessible, expected):
+        assert _make_target(atspi_accessible=accessible).is_valid() is expected
 
     def test_default_is_active_false(self):
-        t = self._make_target()
+        t = _make_target()
         assert t.is_active is False
 
 
@@ -144,62 +159,51 @@ class TestWindowTarget:
 
 
 class TestWindowGroup:
-    def _make_target(self, wid: str = "win_1", **kwargs) -> WindowTarget:
-        defaults = {
-            "window_id": wid,
-            "app_name": "App",
-            "window_title": "Title",
-            "atspi_accessible": MagicMock(),
-        }
-        defaults.update(kwargs)
-        return WindowTarget(**defaults)
-
-    def test_add_window_first_becomes_active(self):
-        group = WindowGroup()
-        t = self._make_target("win_1")
-        group.add_window(t)
-        assert group.active_window_id == "win_1"
-        assert t.is_active is True
-
-    def test_add_window_second_not_active(self):
-        group = WindowGroup()
-        group.add_window(self._make_target("win_1"))
-        t2 = self._make_target("win_2")
-        group.add_window(t2)
-        assert t2.is_active is False
-        assert group.active_window_id == "win_1"
-
-    def test_remove_window_switches_active(self):
-        group = WindowGroup()
-        group.add_window(self._make_target("win_1"))
-        group.add_window(self._make_target("win_2"))
-        group.remove_window("win_1")
-        assert group.active_window_id == "win_2"
-
-    def test_remove_last_window_clears_active(self):
+    @pytest.mark.parametrize(
+        "ops, expected_active",
+        [
+            pytest.param([("add", "win_1")], "win_1", id="first_becomes_active"),
+            pytest.param([("add", "win_1"), ("add", "win_2")], "win_1", id="second_not_active"),
+            pytest.param(
+                [("add", "win_1"), ("add", "win_2"), ("remove", "win_1")],
+                "win_2",
+                id="remove_switches_active",
+            ),
+            pytest.param(
+                [("add", "win_1"), ("remove", "win_1")], None, id="remove_last_clears_active"
+            ),
+            pytest.param(
+                [("add", "win_1"), ("add", "win_2"), ("set", "win_2")],
+                "win_2",
+                id="set_active",
+            ),
+            pytest.param([("add", "win_1"), ("set", "win_99")], "win_1", id="set_nonexistent"),
+        ],
+    )
+    def test_active_window(self, ops, expected_active):
         group = WindowGroup()
-        group.add_window(self._make_target("win_1"))
-        group.remove_window("win_1")
-        assert group.active_window_id is None
+        for op, wid in ops:
+            if op == "add":
+                group.add_window(_make_target(wid))
+            elif op == "remove":
+                group.remove_window(wid)
+            else:
+                group.set_active_window(wid)
+        assert group.active_window_id == expected_active
+        active = [wid for wid, t in group.windows.items() if t.is_active]
+        assert active == ([expected_active] if expected_active else [])
 
     def test_remove_nonexistent_returns_none(self):
         group = WindowGroup()
         assert group.remove_window("win_99") is None
 
-    def test_set_active_window(self):
-        group = WindowGroup()
-        group.add_window(self._make_target("win_1"))
-        group.add_window(self._make_target("win_2"))
-        assert group.set_active_window("win_2") is True
-        assert group.active_window_id == "win_2"
-
     def test_set_active_window_nonexistent(self):
         group = WindowGroup()
         assert group.set_active_window("win_99") is False
 
     def test_get_active_window(self):
         group = WindowGroup()
-        t = self._make_target("win_1")
+        t = _make_target("win_1")
         group.add_window(t)
         assert group.get_active_window() is t
 
@@ -208,21 +212,57 @@ class TestWindowGroup:
         assert group.get_active_window() is None
 
     def test_validate_windows_removes_invalid(self):
-        bad_acc = MagicMock()
-        bad_acc.get_state_set.side_effect = Exception("gone")
         group = WindowGroup()
-        group.add_window(self._make_target("win_1", atspi_accessible=bad_acc))
+        group.add_window(_make_target("win_1", atspi_accessible=_CLOSED))
         removed = group.validate_windows()
         assert "win_1" in removed
         assert len(group.windows) == 0
 
     def test_validate_windows_keeps_valid(self):
         group = WindowGroup()
-        group.add_window(self._make_target("win_1"))
+        group.add_window(_make_target("win_1"))
         removed = group.validate_windows()
         assert removed == []
         assert len(group.windows) == 1
 
+    def test_validate_windows_reuses_recent_result(self, clock):
+        acc = MagicMock()
+        group = WindowGroup()
+        group.add_window(_make_target("win_1", atspi_accessible=acc))
+        group.validate_windows()
+        clock.advance(WindowGroup.VALIDATE_TTL / 2)
+        group.validate_windows()
+        assert acc.get_state_set.call_count == 1
+
+        acc.get_state_set.side_effect = Exception("gone")
+        assert group.validate_windows() == []
+        assert group.validate_windows(force=True) == ["win_1"]
+
+    def test_invalidate_validation_forces_recheck(self, clock):
+        acc = MagicMock()
+        group = WindowGroup()
+        group.add_window(_make_target("win_1", atspi_accessible=acc))
+        group.validate_windows()
+        acc.get_state_set.side_effect = Exception("gone")
+        group.invalidate_validation()
+        assert group.validate_windows() == ["win_1"]
+
+    def test_validate_windows_rechecks_after_ttl(self, clock):
+        acc = MagicMock()
+        group = WindowGroup()
+        group.add_window(_make_target("win_1", atspi_accessible=acc))
+        group.validate_windows()
+        acc.get_state_set.side_effect = Exception("gone")
+        clock.advance(WindowGroup.VALIDATE_TTL)
+        assert group.validate_windows() == ["win_1"]
+
+    def test_validate_windows_rechecks_after_add(self):
+        group = WindowGroup()
+        group.add_window(_make_target("win_1"))
+        group.validate_windows()
+        group.add_window(_make_target("win_2", atspi_accessible=_CLOSED))
+        assert group.validate_windows() == ["win_2"]
+
     def test_to_dict(self):
         group = WindowGroup(name="test")
         d = group.to_dict()
@@ -233,13 +273,13 @@ class TestWindowGroup:
     def test_len(self):
         group = WindowGroup()
         assert len(group) == 0
-        group.add_window(self._make_target("win_1"))
+        group.add_window(_make_target("win_1"))
         assert len(group) == 1
 
     def test_get_all_windows(self):
         group = WindowGroup()
-        group.add_window(self._make_target("win_1"))
-        group.add_window(self._make_target("win_2"))
+        group.add_window(_make_target("win_1"))
+        group.add_window(_make_target("win_2"))
         assert len(group.get_all_windows()) == 2
 
 
@@ -248,117 +288,112 @@ class TestWindowGroup:
 # ---------------------------------------------------------------------------
 
 
+@pytest.fixture
+def mgr() -> WindowGroupManager:
+    return WindowGroupManager()
+
+
+@pytest.fixture
+def mgr_with_window(mgr) -> tuple[WindowGroupManager, WindowGroup, WindowTarget]:
+    """A manager whose active group holds a single window."""
+    group, target = mgr.add_window_to_active_group(
+        app_name="A", window_title="W", atspi_accessible=_ACCESSIBLE
+    )
+    return mgr, group, target
+
+
+@pytest.fixture(scope="module")
+def mgr_two_groups() -> tuple[WindowGroupManager, WindowGroup, WindowGroup]:
+    """A shared two-group manager; only for tests that never mutate it."""
+    m = WindowGroupManager()
+    g1 = m.create_group(name="first")
+    g2 = m.create_group(name="second")
+    return m, g1, g2
+
+
 class TestWindowGroupManager:
-    def test_create_group(self):
-        mgr = WindowGroupManager()
+    def test_create_group(self, mgr):
         group = mgr.create_group(name="test")
         assert group.name == "test"
         assert mgr.get_active_group() is group  # first becomes active
 
-    def test_create_second_group_stays_first_active(self):
-        mgr = WindowGroupManager()
-        g1 = mgr.create_group(name="first")
-        mgr.create_group(name="second")
+    def test_create_second_group_stays_first_active(self, mgr_two_groups):
+        mgr, g1, _ = mgr_two_groups
         assert mgr.get_active_group() is g1
 
-    def test_set_active_group(self):
-        mgr = WindowGroupManager()
+    def test_set_active_group(self, mgr):
         mgr.create_group(name="first")
         g2 = mgr.create_group(name="second")
         mgr.set_active_group(g2.group_id)
         assert mgr.get_active_group() is g2
 
-    def test_set_active_group_invalid(self):
-        mgr = WindowGroupManager()
+    def test_set_active_group_invalid(self, mgr):
         assert mgr.set_active_group("nonexistent") is False
 
-    def test_delete_group(self):
-        mgr = WindowGroupManager()
+    def test_delete_group(self, mgr):
         g = mgr.create_group()
         deleted = mgr.delete_group(g.group_id)
         assert deleted is g
         assert mgr.get_active_group() is None
 
-    def test_delete_active_switches_to_remaining(self):
-        mgr = WindowGroupManager()
+    def test_delete_active_switches_to_remaining(self, mgr):
         g1 = mgr.create_group()
         g2 = mgr.create_group()
         mgr.set_active_group(g1.group_id)
         mgr.delete_group(g1.group_id)
         assert mgr.get_active_group() is g2
 
-    def test_get_or_create_active_group(self):
-        mgr = WindowGroupManager()
+    def test_get_or_create_active_group(self, mgr):
         g = mgr.get_or_create_active_group()
         assert g is not None
         # Calling again returns same
         assert mgr.get_or_create_active_group() is g
 
-    def test_add_window_to_active_group(self):
-        mgr = WindowGroupManager()
-        group, target = mgr.add_window_to_active_group(
-            app_name="App", window_title="Win", atspi_accessible=MagicMock()
-        )
+    def test_add_window_to_active_group(self, mgr_with_window):
+        mgr, group, target = mgr_with_window
         assert target.window_id.startswith("win_")
         assert target.window_id in group.windows
+        assert mgr.get_active_group() is group
 
-    def test_generate_window_id_unique(self):
-        mgr = WindowGroupManager()
-        ids = {mgr._generate_window_id() for _ in range(100)}
-        assert len(ids) == 100
+    def test_generate_window_id_unique(self, mgr):
+        ids = {mgr._generate_window_id() for _ in range(16)}
+        assert len(ids) == 16
 
-    def test_find_window_by_id(self):
-        mgr = WindowGroupManager()
-        _, target = mgr.add_window_to_active_group(
-            app_name="A", window_title="W", atspi_accessible=MagicMock()
-        )
-        result = mgr.find_window_by_id(target.window_id)
-        assert result is not None
-        assert result[1] is target
+    def test_find_window_by_id(self, mgr_with_window):
+        mgr, group, target = mgr_with_window
+        assert mgr.find_window_by_id(target.window_id) == (group, target)
 
-    def test_find_window_by_id_not_found(self):
-        mgr = WindowGroupManager()
+    def test_find_window_by_id_not_found(self, mgr):
         assert mgr.find_window_by_id("win_999") is None
 
-    def test_release_window(self):
-        mgr = WindowGroupManager()
-        _, target = mgr.add_window_to_active_group(
-            app_name="A", window_title="W", atspi_accessible=MagicMock()
-        )
+    def test_release_window(self, mgr_with_window):
+        mgr, _, target = mgr_with_window
         released = mgr.release_window(target.window_id)
         assert released is target
 
-    def test_release_window_not_found(self):
-        mgr = WindowGroupManager()
+    def test_release_window_not_found(self, mgr):
         assert mgr.release_window("win_999") is None
 
-    def test_release_all_windows(self):
-        mgr = WindowGroupManager()
-        mgr.add_window_to_active_group(
-            app_name="A", window_title="W1", atspi_accessible=MagicMock()
-        )
+    def test_release_all_windows(self, mgr_with_window):
+        mgr, _, _ = mgr_with_window
         mgr.add_window_to_active_group(
-            app_name="A", window_title="W2", atspi_accessible=MagicMock()
+            app_name="A", window_title="W2", atspi_accessible=_ACCESSIBLE
         )
         count = mgr.release_all_windows()
         assert count == 2
 
-    def test_clear(self):
-        mgr = WindowGroupManager()
-        mgr.add_window_to_active_group(app_name="A", window_title="W", atspi_accessible=MagicMock())
+    def test_clear(self, mgr_with_window):
+        mgr, _, _ = mgr_with_window
         mgr.clear()
         assert mgr.get_active_group() is None
         assert mgr.get_all_groups() == []
 
-    def test_to_dict(self):
-        mgr = WindowGroupManager()
-        mgr.create_group(name="g")
+    def test_to_dict(self, mgr_two_groups):
+        mgr, g1, _ = mgr_two_groups
         d = mgr.to_dict()
-        assert "active_group_id" in d
-        assert d["group_count"] == 1
-
-    def test_get_all_groups(self):
-        mgr = WindowGroupManager()
-        mgr.create_group()
-        mgr.create_group()
-        assert len(mgr.get_all_groups()) == 2
+        assert d["active_group_id"] == g1.group_id
+        assert d["group_count"] == 2
+
+    def test_get_all_groups(self, mgr_two_groups):
+        mgr, g1, g2 = mgr_two_groups
+        assert mgr.get_all_groups() == [g1, g2]